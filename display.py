@@ -0,0 +1,277 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pygame
+from dotenv import load_dotenv
+from rgb_gradient import get_linear_gradient
+
+from tsp.pipeline import SolverProcess
+
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+RED = (255, 0, 0)
+PINK = (255, 20, 147)
+GREEN = (0, 200, 0)
+GREY = (110, 110, 110)
+intermediate_colors = [(255, 0, 0), (255, 165, 0), (255, 255, 0), (0, 255, 0), (0, 0, 255), (138, 43, 226)]
+
+
+def env_int(name, default):
+    value = os.getenv(name)
+    return default if value in (None, '') else int(value)
+
+
+class TourRenderer:
+    # Draws a tour over a background of axes and cities that is rendered once.
+    # Screen coordinates and text surfaces are cached, the window is redrawn only
+    # when a new tour arrives, and the loop sleeps to `fps` in between. push() may
+    # be called from any thread; the newest pushed tour wins.
+    def __init__(self, points, caption, highlighted=(), fps=30):
+        load_dotenv()
+        width = env_int('WIDTH', 1200)
+        height = env_int('HEIGHT', 800)
+        chart_width = env_int('CHART_WIDTH', 1000)
+        chart_height = env_int('CHART_HEIGHT', 650)
+        chart_origin = (env_int('CHART_ORIGIN_X', 100), env_int('CHART_ORIGIN_Y', 740))
+        self.text_position = (env_int('CHART_DISTANCE_X', 100), env_int('CHART_DISTANCE_Y', 20))
+        self.fps = fps
+
+        pygame.init()
+        pygame.font.init()
+        self.screen = pygame.display.set_mode((width, height))
+        pygame.display.set_caption(caption)
+        self.font = pygame.font.Font(None, 48)
+        self.clock = pygame.time.Clock()
+
+        points = np.asarray(points, dtype=np.float64)
+        x_max, y_max = points.max(axis=0)
+        screen_x = chart_origin[0] + points[:, 0] / x_max * chart_width
+        screen_y = chart_origin[1] - points[:, 1] / y_max * chart_height
+        self.screen_points = list(zip(screen_x.tolist(), screen_y.tolist()))
+
+        self.background = pygame.Surface((width, height))
+        self.background.fill(BLACK)
+        pygame.draw.line(self.background, WHITE, chart_origin, (chart_origin[0], chart_origin[1] - chart_height), 2)
+        pygame.draw.line(self.background, WHITE, chart_origin, (chart_origin[0] + chart_width, chart_origin[1]), 2)
+        for city, (x, y) in enumerate(self.screen_points):
+            color = PINK if city in highlighted else WHITE
+            pygame.draw.rect(self.background, color, (x - 4, y - 4, 8, 8))
+        self.gradient = get_linear_gradient(colors=intermediate_colors, nb_colors=len(points), return_format='rgb')
+
+        self.lock = threading.Lock()
+        self.pending = None
+        self.route = None
+        self.labels = []
+        self.status = (None, None)
+        self.dirty = True
+
+    def push(self, route, distance, elapsed=None):
+        with self.lock:
+            self.pending = (list(route), distance, elapsed)
+
+    def update(self):
+        # takes the newest pushed tour; returns whether there was one
+        with self.lock:
+            pending, self.pending = self.pending, None
+        if pending is None:
+            return False
+        self.route, distance, elapsed = pending
+        self.labels = [(self.font.render(f'Distance: {round(distance, 2)}', False, WHITE), self.text_position)]
+        if elapsed is not None:
+            self.labels.append((self.font.render(f'Time: {round(elapsed, 2)}', False, WHITE),
+                                (self.text_position[0] + 300, self.text_position[1])))
+        return True
+
+    def draw(self):
+        self.screen.blit(self.background, (0, 0))
+        if self.route:
+            route = self.route
+            x, y = self.screen_points[route[0]]
+            pygame.draw.rect(self.screen, RED, (x - 4, y - 4, 8, 8))
+            for i in range(len(route)):
+                pygame.draw.line(self.screen, self.gradient[i], self.screen_points[route[i]],
+                                 self.screen_points[route[(i + 1) % len(route)]], 1)
+        for surface, position in self.labels:
+            self.screen.blit(surface, position)
+        if self.status[0] is not None:
+            self.screen.blit(*self.status)
+        pygame.display.flip()
+
+    def set_status(self, text):
+        # a second text line under the distance, e.g. for interactive controls
+        surface = self.font.render(text, False, WHITE) if text else None
+        self.status = (surface, (self.text_position[0], self.text_position[1] + 40))
+        self.dirty = True
+
+    def run(self, on_frame=None, on_key=None):
+        # until the window is closed or Enter is pressed; on_frame() runs once per
+        # frame and on_key(key) for every other key press
+        running = True
+        while running:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_RETURN:
+                        running = False
+                    elif on_key is not None:
+                        on_key(event.key)
+            if on_frame is not None:
+                on_frame()
+            if self.update() or self.dirty:
+                self.draw()
+                self.dirty = False
+            self.clock.tick(self.fps)
+        pygame.quit()
+
+
+def show_tour(points, route, distance, caption, highlighted=(), elapsed=None):
+    renderer = TourRenderer(points, caption, highlighted)
+    renderer.push(route, distance, elapsed)
+    renderer.run()
+
+
+def solve_and_show(points, caption, solver, *args, highlighted=(), **kwargs):
+    # Runs solver(*args, progress=..., **kwargs) in a background thread and animates
+    # every improved tour it reports. Closing the window stops the solver; returns
+    # its (distance, route), or None if it had not finished.
+    renderer = TourRenderer(points, caption, highlighted)
+    stopped = threading.Event()
+    result = {}
+
+    def progress(event):
+        if 'route' in event:
+            renderer.push(event['route'], event['best'], event['elapsed'])
+        return stopped.is_set()
+
+    def run():
+        start = time.perf_counter()
+        distance, route = solver(*args, progress=progress, **kwargs)
+        result['value'] = distance, route
+        renderer.push(route, distance, time.perf_counter() - start)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    renderer.run()
+    stopped.set()
+    thread.join()
+    return result.get('value')
+
+
+def solve_interactively(points, caption, solver, *args, parameters=(), highlighted=(), **kwargs):
+    # Runs solver(*args, **kwargs) in a worker process (tsp.pipeline) and shows
+    # every improved tour as it streams in. Space pauses and resumes, S or Escape
+    # stops the search and keeps the best tour, Tab picks one of `parameters` and
+    # Up/Down scale it by 1.25 while the solver runs. Returns the best
+    # (distance, route) found, even if the search was stopped early.
+    renderer = TourRenderer(points, caption, highlighted)
+    worker = SolverProcess(solver, *args, **kwargs).start()
+    parameters = list(parameters)
+    selected = [0]
+    values = {name: kwargs[name] for name in parameters if name in kwargs}
+
+    def describe():
+        if worker.error is not None:
+            state = 'failed, see the console'
+        elif worker.done:
+            state = 'finished'
+        else:
+            state = 'paused' if worker.paused else 'running'
+        if parameters:
+            name = parameters[selected[0]]
+            value = (worker.last_event or {}).get(name, values.get(name))
+            if value is not None:
+                state += f'  {name} = {value:.4g}'
+        return state
+
+    def on_frame():
+        events = worker.poll()
+        if events:
+            if worker.best is not None:
+                elapsed = (worker.last_event or {}).get('elapsed')
+                renderer.push(worker.best[1], worker.best[0], elapsed)
+            renderer.set_status(describe())
+
+    def on_key(key):
+        if worker.done:
+            return
+        if key == pygame.K_SPACE:
+            if worker.paused:
+                worker.resume()
+            else:
+                worker.pause()
+        elif key in (pygame.K_s, pygame.K_ESCAPE):
+            worker.stop()
+        elif key == pygame.K_TAB and parameters:
+            selected[0] = (selected[0] + 1) % len(parameters)
+        elif key in (pygame.K_UP, pygame.K_DOWN) and parameters:
+            name = parameters[selected[0]]
+            value = (worker.last_event or {}).get(name, values.get(name))
+            if value is not None:
+                values[name] = value * 1.25 if key == pygame.K_UP else value / 1.25
+                worker.set_parameters(**{name: values[name]})
+        renderer.set_status(describe())
+
+    renderer.set_status(describe())
+    try:
+        renderer.run(on_frame, on_key)
+    except BaseException:
+        worker.terminate()
+        raise
+    return worker.join()
+
+
+class ConvergenceChart:
+    # A live plot of the current (grey) and best (green) tour length against the
+    # iteration, usable as a solver's progress callback. It redraws at most `fps`
+    # times a second; closing the window asks the solver to stop.
+    def __init__(self, caption, size=(900, 500), fps=20):
+        pygame.init()
+        pygame.font.init()
+        self.screen = pygame.display.set_mode(size)
+        pygame.display.set_caption(caption)
+        self.font = pygame.font.Font(None, 28)
+        self.interval = 1 / fps
+        self.last_draw = 0.0
+        self.history = []
+
+    def __call__(self, event):
+        self.history.append((event['iteration'], event['current'], event['best']))
+        stop = False
+        for window_event in pygame.event.get():
+            if window_event.type == pygame.QUIT:
+                stop = True
+        now = time.perf_counter()
+        if stop or now - self.last_draw >= self.interval:
+            self.last_draw = now
+            self.draw(event)
+        return stop
+
+    def draw(self, event):
+        width, height = self.screen.get_size()
+        left, top, right, bottom = 80, 50, width - 20, height - 40
+        iterations = [iteration for iteration, _, _ in self.history]
+        lengths = [length for _, current, best in self.history for length in (current, best)]
+        x_low, x_high = min(iterations), max(iterations)
+        y_low, y_high = min(lengths), max(lengths)
+
+        def to_screen(iteration, length):
+            x = left + (iteration - x_low) / ((x_high - x_low) or 1) * (right - left)
+            y = bottom - (length - y_low) / ((y_high - y_low) or 1) * (bottom - top)
+            return x, y
+
+        self.screen.fill(BLACK)
+        pygame.draw.line(self.screen, WHITE, (left, bottom), (left, top), 2)
+        pygame.draw.line(self.screen, WHITE, (left, bottom), (right, bottom), 2)
+        if len(self.history) > 1:
+            pygame.draw.lines(self.screen, GREY, False, [to_screen(i, current) for i, current, _ in self.history])
+            pygame.draw.lines(self.screen, GREEN, False, [to_screen(i, best) for i, _, best in self.history], 2)
+        label = f"{event['solver']}  iteration {event['iteration']}  best {event['best']:.2f}"
+        if event.get('acceptance') is not None:
+            label += f"  acceptance {event['acceptance']:.1%}"
+        self.screen.blit(self.font.render(label, True, WHITE), (left, 15))
+        self.screen.blit(self.font.render(f'{y_high:.0f}', True, WHITE), (5, top))
+        self.screen.blit(self.font.render(f'{y_low:.0f}', True, WHITE), (5, bottom - 20))
+        pygame.display.flip()
@@ -0,0 +1,11 @@
+from display import show_tour
+from tsp.candidates import nearest_neighbors
+from tsp.distance_matrix import build_distance_matrix
+from tsp.lin_kernighan import lin_kernighan
+from tsp.loader import load_points
+
+if __name__ == '__main__':
+    points = load_points('input.txt')
+    dist_matrix = build_distance_matrix(points)
+    best_distance, best_route = lin_kernighan(dist_matrix, nearest_neighbors(points, 10))
+    show_tour(points, best_route, best_distance, "Berlin 52 Lin-Kernighan")
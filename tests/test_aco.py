@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+import tsp.aco
+from tsp.aco import ant_colony_optimization, sample_rows
+from tsp.candidates import nearest_neighbors
+from tsp.constraints import Constraints
+from tsp.distance_matrix import build_distance_matrix, tour_length
+from tsp.multistart import seed_rngs
+
+POINTS = np.random.default_rng(11).random((30, 2)) * 1000
+# cities at identical coordinates, as real TSPLIB files have
+POINTS[5] = POINTS[3]
+POINTS[17] = POINTS[11]
+POINTS[23] = POINTS[3]
+DIST_MATRIX = build_distance_matrix(POINTS)
+NEIGHBORS = nearest_neighbors(POINTS, 8)
+
+
+def assert_tour(route, n, distance=None):
+    assert sorted(int(city) for city in route) == list(range(n))
+    if distance is not None:
+        assert distance == pytest.approx(tour_length(DIST_MATRIX, route))
+
+
+@pytest.fixture
+def every_ant_checked(monkeypatch):
+    # every tour any ant builds must visit each city once, not only the best one
+    construct_tours = tsp.aco.construct_tours
+
+    def checked(n, *args, **kwargs):
+        routes = construct_tours(n, *args, **kwargs)
+        for route in routes:
+            assert_tour(route, n)
+        return routes
+
+    monkeypatch.setattr(tsp.aco, 'construct_tours', checked)
+
+
+@pytest.mark.parametrize('variant', ['as', 'mmas', 'acs'])
+@pytest.mark.parametrize('sparse', [False, True])
+def test_ants_never_repeat_a_city(variant, sparse, every_ant_checked):
+    seed_rngs(1)
+    distance, route = ant_colony_optimization(DIST_MATRIX, 10, 30, variant=variant, neighbors=NEIGHBORS,
+                                              sparse=sparse)
+    assert_tour(route, len(POINTS), distance)
+
+
+def test_ants_survive_trail_underflow(every_ant_checked):
+    # rho close to 1 drives every trail below the smallest float within a few hundred iterations
+    seed_rngs(2)
+    distance, route = ant_colony_optimization(DIST_MATRIX, 5, 700, rho=0.9)
+    assert_tour(route, len(POINTS), distance)
+
+
+@pytest.mark.parametrize('variant', ['as', 'mmas', 'acs'])
+def test_constrained_ants_start_at_the_depot(variant, every_ant_checked):
+    seed_rngs(3)
+    constraints = Constraints(len(POINTS), depot=4)
+    constraints.prioritize([7, 9], 10.0)
+    constraints.visit_within([7, 9], 5)
+    distance, route = ant_colony_optimization(DIST_MATRIX, 10, 20, variant=variant, two_opt=True,
+                                              constraints=constraints)
+    assert route[0] == 4
+    assert_tour(route, len(POINTS), distance)
+
+
+def test_sample_rows_follows_the_weights():
+    np.random.seed(4)
+    weights = np.array([[0.0, 1.0, 3.0, 0.0], [0.0, 0.0, 0.0, 0.0], [2.0, 0.0, 0.0, 0.0]])
+    allowed = np.array([[False, True, True, False], [True, False, False, True], [True, False, False, False]])
+    choices = np.array([sample_rows(weights, allowed) for _ in range(4000)])
+    # proportional to the weights, uniform over the allowed columns of an all-zero row
+    assert np.mean(choices[:, 0] == 2) == pytest.approx(0.75, abs=0.03)
+    assert set(choices[:, 1].tolist()) == {0, 3}
+    assert np.mean(choices[:, 1] == 0) == pytest.approx(0.5, abs=0.03)
+    assert (choices[:, 2] == 0).all()
+    assert (sample_rows(weights, allowed, exploit=1.0)[[0, 2]] == [2, 0]).all()
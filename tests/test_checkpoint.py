@@ -0,0 +1,79 @@
+import os
+import random
+
+import numpy as np
+import pytest
+
+from tsp.aco import ant_colony_optimization
+from tsp.annealing import simulated_annealing
+from tsp.candidates import nearest_neighbors
+from tsp.checkpoint import Checkpoint
+from tsp.distance_matrix import build_distance_matrix
+from tsp.genetic import genetic_algorithm
+from tsp.lin_kernighan import lin_kernighan
+from tsp.multistart import seed_rngs
+from tsp.tabu import tabu_search
+
+POINTS = np.random.default_rng(7).random((40, 2)) * 1000
+DIST_MATRIX = build_distance_matrix(POINTS)
+NEIGHBORS = nearest_neighbors(POINTS, 8)
+
+SOLVERS = {
+    'tabu': lambda **kwargs: tabu_search(DIST_MATRIX, 400, 10, neighbors=NEIGHBORS, **kwargs),
+    'sa': lambda **kwargs: simulated_annealing(DIST_MATRIX, 1000, 0.999, 4000, neighbors=NEIGHBORS, **kwargs),
+    'ga': lambda **kwargs: genetic_algorithm(DIST_MATRIX, 20, 40, **kwargs),
+    'aco': lambda **kwargs: ant_colony_optimization(DIST_MATRIX, 10, 30, neighbors=NEIGHBORS, **kwargs),
+    'mmas': lambda **kwargs: ant_colony_optimization(DIST_MATRIX, 10, 30, variant='mmas', two_opt=True,
+                                                     neighbors=NEIGHBORS, **kwargs),
+    'acs': lambda **kwargs: ant_colony_optimization(DIST_MATRIX, 10, 30, variant='acs', neighbors=NEIGHBORS,
+                                                    **kwargs),
+    'sparse-aco': lambda **kwargs: ant_colony_optimization(DIST_MATRIX, 10, 30, neighbors=NEIGHBORS, sparse=True,
+                                                           **kwargs),
+    'lk': lambda **kwargs: lin_kernighan(DIST_MATRIX, NEIGHBORS, max_trials=60, **kwargs),
+}
+
+
+@pytest.mark.parametrize('name', sorted(SOLVERS))
+def test_resumed_run_matches_an_uninterrupted_one(name, tmp_path):
+    solve = SOLVERS[name]
+    seed_rngs(3)
+    expected = solve()
+
+    path = str(tmp_path / 'run.pkl')
+    seed_rngs(3)
+    interrupted = []
+
+    def stop_halfway(event):
+        # stop once, some way in; checkpoints are written before progress is reported
+        if event['iteration'] >= 10 and not interrupted:
+            interrupted.append(event['iteration'])
+            return True
+        return False
+
+    solve(checkpoint=Checkpoint(path, interval=0.0), progress=stop_halfway)
+    assert interrupted
+    seed_rngs(99)
+    resumed = solve(checkpoint=Checkpoint(path, interval=0.0, resume=True))
+    assert resumed[0] == pytest.approx(expected[0])
+    assert resumed[1] == expected[1]
+
+
+def test_checkpoint_file_handling(tmp_path):
+    path = str(tmp_path / 'run.pkl')
+    assert Checkpoint(path, resume=True).load('tabu') is None
+    checkpoint = Checkpoint(path, interval=60.0)
+    assert not checkpoint.due()
+    random.seed(5)
+    np.random.seed(5)
+    checkpoint.save('tabu', {'iteration': 7})
+    assert os.listdir(tmp_path) == ['run.pkl']
+    expected = (random.random(), np.random.random())
+
+    # without resume an existing file is ignored
+    assert Checkpoint(path).load('tabu') is None
+    with pytest.raises(ValueError, match='written by tabu'):
+        Checkpoint(path, resume=True).load('sa')
+    random.seed(6)
+    np.random.seed(6)
+    assert Checkpoint(path, resume=True).load('tabu') == {'iteration': 7}
+    assert (random.random(), np.random.random()) == expected
@@ -0,0 +1,125 @@
+import random
+
+import numpy as np
+import pytest
+
+from tsp.aco import ant_colony_optimization
+from tsp.annealing import adaptive_annealing, simulated_annealing
+from tsp.candidates import nearest_neighbors
+from tsp.cli import main
+from tsp.constraints import Constraints, swap_penalty_delta, two_opt_penalty_delta
+from tsp.distance_matrix import CoordinateDistances, build_distance_matrix, tour_length
+from tsp.genetic import genetic_algorithm
+from tsp.multistart import seed_rngs
+from tsp.tabu import tabu_search
+from tsp.tour import ArrayTour
+
+CONSTRAINED_SOLVERS = {
+    'tabu': lambda dist_matrix, neighbors, constraints: tabu_search(dist_matrix, 3000, 10, neighbors=neighbors,
+                                                                    constraints=constraints),
+    'sa': lambda dist_matrix, neighbors, constraints: simulated_annealing(dist_matrix, 1000, 0.999, 6000,
+                                                                          neighbors=neighbors, constraints=constraints),
+    'asa': lambda dist_matrix, neighbors, constraints: adaptive_annealing(dist_matrix, 0.5, neighbors=neighbors,
+                                                                          constraints=constraints),
+    'ga': lambda dist_matrix, neighbors, constraints: genetic_algorithm(dist_matrix, 30, 60, constraints=constraints),
+    'acs': lambda dist_matrix, neighbors, constraints: ant_colony_optimization(dist_matrix, 10, 20, variant='acs',
+                                                                              two_opt=True, neighbors=neighbors,
+                                                                              constraints=constraints),
+}
+
+
+def random_constraints(rng, n):
+    constraints = Constraints(n, depot=rng.randrange(n))
+    constraints.prioritize(rng.sample(range(n), 3), 10.0)
+    constraints.visit_within(rng.sample(range(n), 2), rng.randrange(1, n))
+    constraints.visit_window(rng.sample(range(n), 2), rng.randrange(n), rng.randrange(n), 100.0)
+    return constraints
+
+
+def test_penalties_match_the_ranks():
+    rng = random.Random(0)
+    n = 25
+    constraints = random_constraints(rng, n)
+    routes = np.array([rng.sample(range(n), n) for _ in range(10)])
+    for route, total in zip(routes, constraints.population_penalties(routes)):
+        route = route.tolist()
+        start = route.index(constraints.depot)
+        expected = sum(constraints.table[constraints.row_of[city], (k - start) % n]
+                       for k, city in enumerate(route) if city in constraints.row_of)
+        assert total == expected
+        assert constraints.route_penalty(route) == expected
+
+
+def test_swap_penalty_delta_matches_a_full_recompute():
+    rng = random.Random(1)
+    for _ in range(50):
+        n = rng.randrange(5, 30)
+        constraints = random_constraints(rng, n)
+        penalty = constraints.penalty_rows()
+        for _ in range(20):
+            route = rng.sample(range(n), n)
+            position = [0] * n
+            for k, city in enumerate(route):
+                position[city] = k
+            i, j = rng.sample(range(n), 2)
+            swapped = route[:]
+            swapped[i], swapped[j] = swapped[j], swapped[i]
+            expected = constraints.route_penalty(swapped) - constraints.route_penalty(route)
+            delta = swap_penalty_delta(penalty, route, position, constraints.depot, i, j)
+            assert abs(delta - expected) < 1e-6
+
+
+def test_two_opt_penalty_delta_matches_a_full_recompute():
+    rng = random.Random(2)
+    for _ in range(50):
+        n = rng.randrange(5, 30)
+        constraints = random_constraints(rng, n)
+        penalty = constraints.penalty_rows()
+        for _ in range(20):
+            tour = ArrayTour(rng.sample(range(n), n))
+            b, c = rng.sample(range(n), 2)
+            delta = two_opt_penalty_delta(penalty, tour, constraints.depot, b, c)
+            before = constraints.route_penalty(tour.order)
+            tour.reverse(b, c)
+            assert abs(delta - (constraints.route_penalty(tour.order) - before)) < 1e-6
+
+
+def test_rank_bias_without_a_dense_matrix():
+    rng = random.Random(3)
+    points = np.random.default_rng(3).random((300, 2))
+    constraints = random_constraints(rng, len(points))
+    expected = constraints.rank_bias(build_distance_matrix(points), 5)
+    for dist_matrix in (CoordinateDistances(points), build_distance_matrix(points)):
+        for neighbors in (None, nearest_neighbors(points, 5)):
+            cities, factors = constraints.rank_bias(dist_matrix, 5, neighbors)
+            assert np.array_equal(cities, expected[0])
+            assert np.allclose(factors, expected[1])
+
+
+def test_cli_passes_constraints_to_the_solver(tmp_path, capsys):
+    points = np.random.default_rng(4).random((20, 2)) * 100
+    instance = tmp_path / 'cities.txt'
+    instance.write_text(''.join(f'{city + 1} {x} {y}\n' for city, (x, y) in enumerate(points)))
+    assert main(['sa', '--input', str(instance), '--seed', '0', '--depot', '4', '--priority', '7,9']) == 0
+    output = capsys.readouterr()
+    route = [int(city) for city in output.out.split()[1:]]
+    assert route[0] == 4
+    constraints = Constraints(len(points), depot=3)
+    constraints.prioritize([6, 8])
+    assert f'penalty: {constraints.route_penalty([city - 1 for city in route]):.2f}' in output.err
+
+
+@pytest.mark.parametrize('name', sorted(CONSTRAINED_SOLVERS))
+def test_solvers_honour_heavy_constraints(name):
+    seed_rngs(5)
+    points = np.random.default_rng(5).random((30, 2)) * 1000
+    dist_matrix = build_distance_matrix(points)
+    constraints = Constraints(len(points), depot=2)
+    # the two cities farthest from the depot, due within the first five stops
+    far = np.argsort(dist_matrix[2])[-2:].tolist()
+    constraints.visit_within(far, 5, weight=1e6)
+    distance, route = CONSTRAINED_SOLVERS[name](dist_matrix, nearest_neighbors(points, 8), constraints)
+    assert route[0] == 2
+    assert sorted(route) == list(range(len(points)))
+    assert distance == pytest.approx(tour_length(dist_matrix, route))
+    assert constraints.route_penalty(route) == 0.0
@@ -0,0 +1,84 @@
+import random
+
+import numpy as np
+import pytest
+
+from tsp.crossover import CROSSOVERS, mutate
+from tsp.distance_matrix import build_distance_matrix
+
+
+@pytest.mark.parametrize('name', sorted(CROSSOVERS))
+def test_children_are_permutations(name):
+    random.seed(0)
+    np.random.seed(0)
+    recombine = CROSSOVERS[name]
+    for n in (5, 12, 60):
+        dist_matrix = build_distance_matrix(np.random.random((n, 2)))
+        out = np.empty(n, dtype=np.int64)
+        for _ in range(100):
+            parent1 = np.random.permutation(n)
+            parent2 = np.random.permutation(n)
+            recombine(parent1, parent2, out, dist_matrix)
+            assert sorted(out.tolist()) == list(range(n))
+            mutate(out, 0.5)
+            assert sorted(out.tolist()) == list(range(n))
+
+
+@pytest.mark.parametrize('name', sorted(CROSSOVERS))
+def test_identical_parents_give_the_same_tour(name):
+    random.seed(1)
+    np.random.seed(1)
+    n = 30
+    dist_matrix = build_distance_matrix(np.random.random((n, 2)))
+    parent = np.random.permutation(n)
+    out = np.empty(n, dtype=np.int64)
+    CROSSOVERS[name](parent, parent.copy(), out, dist_matrix)
+    child = out.tolist()
+    edges = {frozenset(edge) for edge in zip(parent.tolist(), np.roll(parent, -1).tolist())}
+    assert {frozenset(edge) for edge in zip(child, child[1:] + child[:1])} == edges
+
+
+def test_order_crossover_keeps_a_slice_and_the_donor_order():
+    random.seed(2)
+    np.random.seed(2)
+    n = 12
+    out = np.empty(n, dtype=np.int64)
+    for _ in range(100):
+        parent1 = np.random.permutation(n)
+        parent2 = np.random.permutation(n)
+        CROSSOVERS['ox'](parent1, parent2, out, None)
+        child = out.tolist()
+        assert any(child[start:end] == parent1[start:end].tolist()
+                   and child[:start] + child[end:] == [city for city in parent2.tolist()
+                                                       if city not in parent1[start:end]]
+                   for start in range(n) for end in range(start + 1, n + 1))
+
+
+@pytest.mark.parametrize('name', sorted(CROSSOVERS))
+def test_children_are_written_into_preallocated_rows(name):
+    random.seed(3)
+    np.random.seed(3)
+    n = 40
+    dist_matrix = build_distance_matrix(np.random.random((n, 2)))
+    parents = np.array([np.random.permutation(n) for _ in range(6)])
+    offspring = np.full((6, n), -1, dtype=np.int64)
+    for k in range(6):
+        CROSSOVERS[name](parents[k], parents[(k + 1) % 6], offspring[k], dist_matrix)
+    for child in offspring.tolist():
+        assert sorted(child) == list(range(n))
+
+
+def test_mutation_rate():
+    random.seed(4)
+    np.random.seed(4)
+    individual = np.arange(1000)
+    mutate(individual, 0.0)
+    assert individual.tolist() == list(range(1000))
+    moved = 0
+    for _ in range(20):
+        individual = np.arange(1000)
+        mutate(individual, 0.05)
+        assert sorted(individual.tolist()) == list(range(1000))
+        moved += int((individual != np.arange(1000)).sum())
+    # about 50 swaps per call, each moving up to two genes
+    assert 20 * 50 < moved < 20 * 2 * 50 * 1.2
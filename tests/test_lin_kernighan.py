@@ -0,0 +1,84 @@
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from tsp.candidates import matrix_neighbors
+from tsp.distance_matrix import build_distance_matrix, tour_length
+from tsp.lin_kernighan import double_bridge, lin_kernighan, lk_step, nearest_neighbor_tour
+from tsp.multistart import seed_rngs
+from tsp.tour import ArrayTour, TwoLevelTour
+
+POINTS = np.random.default_rng(6).random((80, 2)) * 1000
+DIST_MATRIX = build_distance_matrix(POINTS)
+NEIGHBORS = matrix_neighbors(DIST_MATRIX, 8)
+
+
+def edges(route):
+    return {frozenset(edge) for edge in zip(route, route[1:] + route[:1])}
+
+
+def test_nearest_neighbor_tour_is_greedy():
+    # with lists too short to cover the tour, the row-scan fallback is used as well
+    route = nearest_neighbor_tour(DIST_MATRIX, NEIGHBORS[:, :2].tolist(), 5)
+    assert route[0] == 5 and sorted(route) == list(range(len(POINTS)))
+    for k in range(1, len(route)):
+        left = route[k:]
+        assert DIST_MATRIX[route[k - 1], route[k]] == DIST_MATRIX[route[k - 1], left].min()
+
+
+@pytest.mark.parametrize('tour_type', [ArrayTour, TwoLevelTour])
+def test_double_bridge_exchanges_three_edges(tour_type):
+    random.seed(0)
+    n = len(POINTS)
+    for _ in range(100):
+        tour = tour_type(random.sample(range(n), n))
+        before = edges(tour.to_list())
+        t1, t2, t3, t4, t5, t6 = double_bridge(tour, max_segment=10)
+        after = edges(tour.to_list())
+        removed = edges([t1, t2]) | edges([t3, t4]) | edges([t5, t6])
+        added = edges([t1, t4]) | edges([t5, t2]) | edges([t3, t6])
+        # with one-city segments an edge is both removed and added back
+        assert before - after == removed - added
+        assert after - before == added - removed
+
+
+@pytest.mark.parametrize('tour_type', [ArrayTour, TwoLevelTour])
+def test_lk_step_gain_is_the_length_saved(tour_type):
+    dist = DIST_MATRIX.tolist()
+    neighbors = NEIGHBORS.tolist()
+    rng = random.Random(1)
+    n = len(POINTS)
+    for _ in range(100):
+        tour = tour_type(rng.sample(range(n), n))
+        tour.journal = []
+        before = tour_length(DIST_MATRIX, tour.to_list())
+        t1 = rng.randrange(n)
+        gain, touched = lk_step(tour, dist, neighbors, t1, tour.next(t1), 50)
+        after = tour_length(DIST_MATRIX, tour.to_list())
+        assert before - after == pytest.approx(gain)
+        assert (gain > 0) == bool(touched)
+        # the journal undoes the whole chain
+        tour.rollback(0)
+        assert tour_length(DIST_MATRIX, tour.to_list()) == pytest.approx(before)
+
+
+def test_lin_kernighan_never_worsens_its_start():
+    seed_rngs(2)
+    for _ in range(3):
+        start = random.sample(range(len(POINTS)), len(POINTS))
+        stats = {}
+        distance, route = lin_kernighan(DIST_MATRIX, NEIGHBORS, max_trials=50, route=start, stats=stats)
+        assert sorted(route) == list(range(len(POINTS)))
+        assert distance == pytest.approx(tour_length(DIST_MATRIX, route))
+        assert distance < tour_length(DIST_MATRIX, start)
+        assert stats == {'evaluations': 50, 'unit': 'kicks'}
+
+
+def test_lin_kernighan_solves_a_small_instance():
+    seed_rngs(3)
+    dist_matrix = DIST_MATRIX[:9, :9]
+    optimum = min(tour_length(dist_matrix, (0,) + rest) for rest in itertools.permutations(range(1, 9)))
+    distance, route = lin_kernighan(dist_matrix, max_trials=100)
+    assert distance == pytest.approx(optimum)
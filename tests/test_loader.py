@@ -0,0 +1,96 @@
+import os
+
+import numpy as np
+import pytest
+
+import tsp.loader
+from tsp.loader import cache_path, read_instance
+
+TRIANGLES = {
+    'UPPER_ROW': lambda n: [(i, j) for i in range(n) for j in range(i + 1, n)],
+    'LOWER_ROW': lambda n: [(i, j) for i in range(n) for j in range(i)],
+    'UPPER_DIAG_ROW': lambda n: [(i, j) for i in range(n) for j in range(i, n)],
+    'LOWER_DIAG_ROW': lambda n: [(i, j) for i in range(n) for j in range(i + 1)],
+    'UPPER_COL': lambda n: [(i, j) for j in range(n) for i in range(j)],
+    'LOWER_COL': lambda n: [(i, j) for j in range(n) for i in range(j + 1, n)],
+    'UPPER_DIAG_COL': lambda n: [(i, j) for j in range(n) for i in range(j + 1)],
+    'LOWER_DIAG_COL': lambda n: [(i, j) for j in range(n) for i in range(j, n)],
+    'FULL_MATRIX': lambda n: [(i, j) for i in range(n) for j in range(n)],
+}
+
+
+def write_lines(path, lines):
+    path.write_text('\n'.join(lines) + '\n')
+    return str(path)
+
+
+def coordinate_file(path, points):
+    lines = [f'NAME : {path.stem}', 'TYPE : TSP', f'DIMENSION : {len(points)}', 'EDGE_WEIGHT_TYPE : EUC_2D',
+             'NODE_COORD_SECTION']
+    # scientific notation, as some generators write it
+    lines += [f'{city + 1} {x:.6e} {y:.6e}' for city, (x, y) in enumerate(points)]
+    return write_lines(path, lines + ['EOF'])
+
+
+@pytest.mark.parametrize('edge_weight_format', sorted(TRIANGLES))
+def test_explicit_formats(tmp_path, edge_weight_format):
+    rng = np.random.default_rng(0)
+    n = 9
+    weights = rng.integers(1, 1000, (n, n))
+    weights = np.triu(weights, 1) + np.triu(weights, 1).T
+    values = [str(weights[i, j]) for i, j in TRIANGLES[edge_weight_format](n)]
+    # entries wrap at an arbitrary width, not at matrix rows
+    rows = [' '.join(values[k:k + 7]) for k in range(0, len(values), 7)]
+    path = write_lines(tmp_path / 'explicit.tsp', ['NAME: explicit', 'TYPE: TSP', f'DIMENSION: {n}',
+                                                   'EDGE_WEIGHT_TYPE: EXPLICIT',
+                                                   f'EDGE_WEIGHT_FORMAT: {edge_weight_format}',
+                                                   'EDGE_WEIGHT_SECTION'] + rows + ['EOF'])
+    instance = read_instance(path, cache=False)
+    assert instance['edge_weight_type'] == 'EXPLICIT'
+    assert instance['coordinates'] is None
+    np.testing.assert_array_equal(instance['weights'], weights)
+
+
+def test_numbers_split_across_chunks(tmp_path, monkeypatch):
+    # a chunk size that cuts tokens, exponents and the closing keyword apart
+    monkeypatch.setattr(tsp.loader, 'CHUNK_SIZE', 7)
+    points = np.random.default_rng(1).random((50, 2)) * 1e4
+    instance = read_instance(coordinate_file(tmp_path / 'chunks.tsp', points), cache=False)
+    assert instance['name'] == 'chunks'
+    assert instance['dimension'] == 50
+    np.testing.assert_allclose(instance['coordinates'], points, rtol=1e-6)
+
+
+def test_bare_coordinate_list(tmp_path):
+    points = np.random.default_rng(2).random((20, 2))
+    # ids out of order: the coordinates come back sorted by id
+    order = np.random.default_rng(2).permutation(20)
+    lines = [f'{city + 1} {float(points[city, 0])!r} {float(points[city, 1])!r}' for city in order]
+    instance = read_instance(write_lines(tmp_path / 'input.txt', lines), cache=False)
+    assert instance['dimension'] == 20
+    np.testing.assert_array_equal(instance['coordinates'], points)
+
+
+def test_sidecar_cache(tmp_path, monkeypatch):
+    points = np.random.default_rng(3).random((30, 2))
+    path = coordinate_file(tmp_path / 'cached.tsp', points)
+    first = read_instance(path)
+    assert os.path.exists(cache_path(path, 'coords'))
+
+    # a fresh sidecar is read instead of the numeric section
+    def unexpected(file):
+        raise AssertionError('the coordinates were parsed again')
+
+    monkeypatch.setattr(tsp.loader, 'read_numbers', unexpected)
+    cached = read_instance(path)
+    assert cached['dimension'] == 30
+    np.testing.assert_array_equal(cached['coordinates'], first['coordinates'])
+    monkeypatch.undo()
+
+    # a sidecar older than the instance is ignored and rewritten
+    moved = points + 1.0
+    coordinate_file(tmp_path / 'cached.tsp', moved)
+    stale = os.path.getmtime(path) - 10
+    os.utime(cache_path(path, 'coords'), (stale, stale))
+    np.testing.assert_allclose(read_instance(path)['coordinates'], moved, rtol=1e-6)
+    np.testing.assert_allclose(np.load(cache_path(path, 'coords')), moved, rtol=1e-6)
@@ -0,0 +1,126 @@
+import random
+
+import numpy as np
+import pytest
+
+from tsp.candidates import matrix_neighbors
+from tsp.distance_matrix import build_distance_matrix, tour_length
+from tsp.local_search import improve_or_opt, improve_two_opt, local_search, or_opt_move
+from tsp.moves import or_opt_delta, two_opt_delta
+from tsp.tour import ArrayTour, TwoLevelTour
+
+POINTS = np.random.default_rng(5).random((60, 2)) * 1000
+DIST_MATRIX = build_distance_matrix(POINTS)
+# every other city is a candidate, so the searches see every move their gain criteria admit
+ALL_NEIGHBORS = matrix_neighbors(DIST_MATRIX, len(POINTS) - 1)
+
+
+def edge_moves(tour, n):
+    # every 2-opt move as (a, b, c, d), b = next(a) and d = next(c)
+    for a in range(n):
+        for c in range(n):
+            b, d = tour.next(a), tour.next(c)
+            if c not in (a, b) and d != a:
+                yield a, b, c, d
+
+
+@pytest.mark.parametrize('tour_type', [ArrayTour, TwoLevelTour])
+def test_two_opt_finds_the_moves_its_gain_criterion_admits(tour_type):
+    # a move out of city a is found when the new edge at a is shorter than the
+    # tour edge it replaces, the sequential gain criterion of the search
+    dist = DIST_MATRIX.tolist()
+    neighbors = ALL_NEIGHBORS.tolist()
+    rng = random.Random(0)
+    n = len(POINTS)
+    for _ in range(50):
+        tour = tour_type(rng.sample(range(n), n))
+        a = rng.randrange(n)
+        admitted = [two_opt_delta(dist, *move) for move in edge_moves(tour, n)
+                    if move[0] == a and dist[a][move[2]] < dist[a][move[1]]
+                    or move[1] == a and dist[a][move[3]] < dist[a][move[0]]]
+        before = tour_length(DIST_MATRIX, tour.to_list())
+        delta, touched = improve_two_opt(tour, dist, neighbors, a)
+        if min(admitted, default=0.0) < -1e-9:
+            assert touched is not None and delta < 0
+        else:
+            assert touched is None
+        assert tour_length(DIST_MATRIX, tour.to_list()) - before == pytest.approx(delta)
+
+
+@pytest.mark.parametrize('tour_type', [ArrayTour, TwoLevelTour])
+def test_or_opt_finds_the_city_moves_its_gain_criterion_admits(tour_type):
+    # moving a single city s to an edge not next to it: found when one new edge
+    # at s is shorter than what taking s out of the tour saves
+    dist = DIST_MATRIX.tolist()
+    neighbors = ALL_NEIGHBORS.tolist()
+    rng = random.Random(1)
+    n = len(POINTS)
+    for _ in range(50):
+        tour = tour_type(rng.sample(range(n), n))
+        s = rng.randrange(n)
+        p, nx = tour.prev(s), tour.next(s)
+        removal = dist[p][s] + dist[s][nx] - dist[p][nx]
+        admitted = [or_opt_delta(dist, p, s, s, nx, c, d, s) for c, _, d, _ in edge_moves(tour, n)
+                    if not {c, d} & {p, s, nx} and min(dist[s][c], dist[s][d]) < removal]
+        before = tour_length(DIST_MATRIX, tour.to_list())
+        delta, touched = improve_or_opt(tour, dist, neighbors, s, max_length=1)
+        if min(admitted, default=0.0) < -1e-9:
+            assert touched is not None and delta < 0
+        else:
+            assert touched is None
+        assert sorted(tour.to_list()) == list(range(n))
+        assert tour_length(DIST_MATRIX, tour.to_list()) - before == pytest.approx(delta)
+
+
+@pytest.mark.parametrize('two_level', [False, True])
+@pytest.mark.parametrize('three_opt', [False, True])
+def test_local_search_improves_and_reports(two_level, three_opt):
+    rng = random.Random(2)
+    starts = [rng.sample(range(len(POINTS)), len(POINTS)) for _ in range(5)]
+    for start in starts:
+        stats = {}
+        distance, route = local_search(DIST_MATRIX, start, ALL_NEIGHBORS, three_opt=three_opt, two_level=two_level,
+                                       stats=stats)
+        assert sorted(route) == list(range(len(POINTS)))
+        assert distance == pytest.approx(tour_length(DIST_MATRIX, route))
+        # random tours on the unit square are several times longer than a 2-opt optimum
+        assert distance < tour_length(DIST_MATRIX, start) / 3
+        assert stats['unit'] == 'cities' and stats['evaluations'] >= len(POINTS)
+
+
+@pytest.mark.parametrize('tour_type', [ArrayTour, TwoLevelTour])
+def test_move_deltas_match_the_tour_lengths(tour_type):
+    dist = DIST_MATRIX.tolist()
+    rng = random.Random(1)
+    n = len(POINTS)
+    for _ in range(300):
+        tour = tour_type(rng.sample(range(n), n))
+        before = tour_length(DIST_MATRIX, tour.to_list())
+        forward = rng.random() < 0.5
+        step = tour.next if forward else tour.prev
+        s1 = rng.randrange(n)
+        s2 = s1
+        for _ in range(rng.randrange(3)):
+            s2 = step(s2)
+        p = tour.prev(s1) if forward else tour.next(s1)
+        nx = step(s2)
+        segment = {s1, s2, step(s1)} if s1 != s2 else {s1}
+        c = rng.choice([city for city in range(n) if city not in segment | {p, nx}])
+        d = rng.choice([tour.next(c), tour.prev(c)])
+        if d in segment or d in (p, nx):
+            continue
+        first = rng.choice([s1, s2])
+        delta = or_opt_delta(dist, p, s1, s2, nx, c, d, first)
+        or_opt_move(tour, p, s1, s2, nx, c, d, first)
+        route = tour.to_list()
+        assert sorted(route) == list(range(n))
+        assert tour_length(DIST_MATRIX, route) - before == pytest.approx(delta)
+
+        a = rng.randrange(n)
+        c = rng.randrange(n)
+        b, d = tour.next(a), tour.next(c)
+        if c in (a, b) or d == a:
+            continue
+        delta = two_opt_delta(dist, a, b, c, d)
+        tour.two_opt_move(a, b, c, d)
+        assert tour_length(DIST_MATRIX, tour.to_list()) - tour_length(DIST_MATRIX, route) == pytest.approx(delta)
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from tsp.candidates import nearest_neighbors
+from tsp.pheromones import DensePheromones, SparsePheromones
+
+
+@pytest.mark.parametrize('bounds', [None, (0.05, 3.0)])
+def test_sparse_store_matches_dense_on_candidate_edges(bounds):
+    rng = np.random.default_rng(0)
+    n = 40
+    neighbors = nearest_neighbors(rng.random((n, 2)), 6)
+    dense = DensePheromones(n, 2.0)
+    sparse = SparsePheromones(neighbors, 2.0)
+    if bounds is not None:
+        dense.set_bounds(*bounds)
+        sparse.set_bounds(*bounds)
+    # many evaporations drive the sparse store through its fold-back
+    for step in range(400):
+        dense.evaporate(0.6)
+        sparse.evaporate(0.6)
+        if step % 5 == 0:
+            routes = np.array([rng.permutation(n) for _ in range(4)])
+            amounts = rng.random(4)
+            dense.deposit(routes, amounts)
+            sparse.deposit(routes, amounts)
+        if step % 7 == 0:
+            route = rng.permutation(n)
+            dense.blend(route, np.roll(route, -1), 0.1, 0.5)
+            sparse.blend(route, np.roll(route, -1), 0.1, 0.5)
+    expected = dense.matrix[np.arange(n)[:, None], neighbors]
+    np.testing.assert_allclose(sparse.trails(np.arange(n)), expected, rtol=1e-9, atol=1e-300)
+
+
+def test_sparse_evaporation_is_a_single_factor():
+    rng = np.random.default_rng(1)
+    neighbors = nearest_neighbors(rng.random((30, 2)), 5)
+    sparse = SparsePheromones(neighbors, 1.0)
+    stored = sparse.values.copy()
+    for _ in range(50):
+        sparse.evaporate(0.1)
+    # nothing per edge is touched until the factor is folded back in
+    np.testing.assert_array_equal(sparse.values, stored)
+    np.testing.assert_allclose(sparse.trails(np.arange(30)), 0.9 ** 50)
+    for _ in range(3000):
+        sparse.evaporate(0.1)
+    assert sparse.scale >= 1e-100
+    np.testing.assert_allclose(sparse.trails(np.arange(30)), 0.9 ** 3050, rtol=1e-9)
+
+
+def test_sparse_store_keeps_candidate_edges_only():
+    n = 12
+    # a ring: every city's candidates are its two ring neighbours
+    neighbors = np.array([[(i - 1) % n, (i + 1) % n] for i in range(n)])
+    sparse = SparsePheromones(neighbors, 0.0)
+    ring = np.arange(n)
+    crossing = np.array([0, 2, 4, 6, 8, 10, 1, 11, 9, 7, 5, 3])
+    sparse.deposit(np.array([ring, crossing]), np.array([2.0, 5.0]))
+    # the crossing tour shares no edge with the ring, so its deposit is dropped
+    np.testing.assert_allclose(sparse.trails(ring), 2.0)
+    assert sparse.summary() == {'min': 2.0, 'mean': 2.0, 'max': 2.0}
+    sparse.reset(0.5)
+    assert sparse.scale == 1.0
+    np.testing.assert_allclose(sparse.trails(ring), 0.5)
@@ -0,0 +1,65 @@
+import time
+
+import numpy as np
+import pytest
+
+from tsp.distance_matrix import build_distance_matrix, tour_length
+from tsp.genetic import island_genetic_algorithm
+from tsp.pipeline import SolverProcess
+from tsp.solvers import run_tabu
+
+POINTS = np.random.default_rng(8).random((30, 2)) * 1000
+DIST_MATRIX = build_distance_matrix(POINTS)
+
+
+def wait_for(worker, condition, timeout=60.0):
+    # polls until an event satisfies `condition`; returns the events seen
+    seen = []
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        seen += worker.poll()
+        if any(condition(event) for event in seen):
+            return seen
+        time.sleep(0.01)
+    raise AssertionError('no matching event from the solver process')
+
+
+def test_pause_resume_update_and_stop():
+    worker = SolverProcess(run_tabu, DIST_MATRIX, None).start()
+    try:
+        wait_for(worker, lambda event: 'iteration' in event)
+        worker.pause()
+        # events already on their way may still arrive, then nothing until resumed
+        time.sleep(0.5)
+        worker.poll()
+        time.sleep(0.5)
+        assert worker.poll() == []
+        worker.set_parameters(tabu_size=5)
+        worker.resume()
+        wait_for(worker, lambda event: event.get('tabu_size') == 5)
+        distance, route = worker.join()
+    finally:
+        worker.terminate()
+    assert not worker.process.is_alive()
+    assert worker.done and worker.error is None
+    assert sorted(route) == list(range(len(POINTS)))
+    assert distance == pytest.approx(tour_length(DIST_MATRIX, route))
+
+
+def test_solver_errors_are_raised_by_join():
+    worker = SolverProcess(run_tabu, 'not a distance matrix', None).start()
+    with pytest.raises(RuntimeError, match='Solver failed'):
+        worker.join()
+    assert not worker.process.is_alive()
+
+
+def test_solvers_with_their_own_pool_can_run():
+    worker = SolverProcess(island_genetic_algorithm, DIST_MATRIX, 20, 30, islands=2, processes=2).start()
+    try:
+        wait_for(worker, lambda event: event.get('done'), timeout=120.0)
+        distance, route = worker.join()
+    finally:
+        worker.terminate()
+    assert worker.process.exitcode == 0
+    assert sorted(route) == list(range(len(POINTS)))
+    assert distance == pytest.approx(tour_length(DIST_MATRIX, route))
@@ -0,0 +1,47 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from tsp.candidates import nearest_neighbors
+from tsp.distance_matrix import build_distance_matrix, tour_length
+from tsp.multistart import seed_rngs
+from tsp.solvers import SOLVERS
+
+POINTS = np.random.default_rng(11).random((30, 2)) * 1000
+# cities at identical coordinates, as real TSPLIB files have
+POINTS[5] = POINTS[3]
+POINTS[17] = POINTS[11]
+POINTS[23] = POINTS[3]
+DIST_MATRIX = build_distance_matrix(POINTS)
+NEIGHBORS = nearest_neighbors(POINTS, 8)
+
+
+def assert_tour(route, n, distance=None):
+    assert sorted(int(city) for city in route) == list(range(n))
+    if distance is not None:
+        assert distance == pytest.approx(tour_length(DIST_MATRIX, route))
+
+
+@pytest.mark.parametrize('name', [name for name in SOLVERS if name not in ('islands', 'pt')])
+def test_solvers_return_valid_tours(name):
+    seed_rngs(0)
+    stats = {}
+    distance, route = SOLVERS[name](DIST_MATRIX, NEIGHBORS, stats)
+    assert_tour(route, len(POINTS), distance)
+    assert stats['evaluations'] > 0
+    assert stats['unit']
+
+
+@pytest.mark.parametrize('name', ['hill', 'lk'])
+@pytest.mark.parametrize('n', [1, 2, 3, 4, 5])
+def test_descents_solve_tiny_instances(name, n):
+    # on five cities or fewer, 2-opt and Or-opt reach every other tour in one move
+    seed_rngs(n)
+    dist_matrix = DIST_MATRIX[:n, :n]
+    optimum = min(tour_length(dist_matrix, (0,) + rest) for rest in itertools.permutations(range(1, n)))
+    stats = {}
+    distance, route = SOLVERS[name](dist_matrix, None, stats)
+    assert sorted(route) == list(range(n))
+    assert distance == pytest.approx(optimum)
+    assert stats['unit'] and 'evaluations' in stats
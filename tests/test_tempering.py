@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from tsp.candidates import nearest_neighbors
+from tsp.checkpoint import Checkpoint
+from tsp.constraints import Constraints
+from tsp.distance_matrix import build_distance_matrix, tour_length
+from tsp.multistart import seed_rngs
+from tsp.tempering import parallel_tempering, temperature_ladder
+
+POINTS = np.random.default_rng(9).random((40, 2)) * 1000
+DIST_MATRIX = build_distance_matrix(POINTS)
+NEIGHBORS = nearest_neighbors(POINTS, 8)
+
+
+def test_temperature_ladder_is_geometric():
+    ladder = temperature_ladder(2.0, 200.0, 5)
+    assert ladder[0] == pytest.approx(2.0) and ladder[-1] == pytest.approx(200.0)
+    np.testing.assert_allclose(np.diff(np.log(ladder)), np.log(10.0) / 2)
+    assert temperature_ladder(2.0, 200.0, 1) == [2.0]
+
+
+def test_replicas_return_their_best_tour():
+    seed_rngs(0)
+    stats = {}
+    events = []
+    distance, route = parallel_tempering(DIST_MATRIX, 1.0, replicas=4, moves_per_exchange=2000, processes=2,
+                                         neighbors=NEIGHBORS, progress=events.append, stats=stats)
+    assert sorted(route) == list(range(len(POINTS)))
+    assert distance == pytest.approx(tour_length(DIST_MATRIX, route))
+    assert distance == pytest.approx(min(event['best'] for event in events))
+    # only the moves actually scored are counted, never more than were drawn
+    assert 0 < stats['evaluations'] <= events[-1]['iteration'] * 4 * 2000
+    assert stats['unit'] == 'moves'
+    assert 0 <= stats['swaps'] <= events[-1]['iteration'] * 3
+
+
+def test_constrained_replicas_start_at_the_depot():
+    seed_rngs(1)
+    constraints = Constraints(len(POINTS), depot=6)
+    constraints.visit_within([11, 12], 4)
+    distance, route = parallel_tempering(DIST_MATRIX, 1.0, replicas=4, moves_per_exchange=2000, processes=2,
+                                         neighbors=NEIGHBORS, constraints=constraints)
+    assert route[0] == 6
+    assert sorted(route) == list(range(len(POINTS)))
+
+
+def test_resumed_run_keeps_the_best_tour(tmp_path):
+    path = str(tmp_path / 'pt.pkl')
+    seed_rngs(2)
+    events = []
+
+    def stop_after_three(event):
+        events.append(event)
+        return event['iteration'] >= 3
+
+    parallel_tempering(DIST_MATRIX, 30.0, replicas=4, moves_per_exchange=2000, processes=2, neighbors=NEIGHBORS,
+                       checkpoint=Checkpoint(path, interval=0.0), progress=stop_after_three)
+    stats = {}
+    resumed = []
+
+    def stop_after_six(event):
+        resumed.append(event)
+        return event['iteration'] >= 6
+
+    distance, route = parallel_tempering(DIST_MATRIX, 30.0, replicas=4, moves_per_exchange=2000, processes=2,
+                                         neighbors=NEIGHBORS, checkpoint=Checkpoint(path, interval=0.0, resume=True),
+                                         progress=stop_after_six, stats=stats)
+    # the epochs and the best tours carry over
+    assert resumed[0]['iteration'] == 4
+    assert distance <= events[-1]['best'] + 1e-9
+    assert len(resumed) == 3
+    assert stats['evaluations'] > 6 * 4 * 1000
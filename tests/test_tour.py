@@ -0,0 +1,80 @@
+import random
+
+import pytest
+
+from tsp.tour import ArrayTour, TwoLevelTour
+
+
+def edges(tour):
+    route = tour.to_list()
+    return {frozenset(edge) for edge in zip(route, route[1:] + route[:1])}
+
+
+def random_move(tour, n, rng):
+    a, c = rng.sample(range(n), 2)
+    b = tour.next(a)
+    d = tour.next(c)
+    if c == b or d == a:
+        return None
+    return a, b, c, d
+
+
+@pytest.mark.parametrize('segment_size', [None, 3, 7])
+def test_two_level_tour_matches_array_tour(segment_size):
+    rng = random.Random(segment_size)
+    n = 97
+    route = rng.sample(range(n), n)
+    flat = ArrayTour(route)
+    two_level = TwoLevelTour(route, segment_size)
+    for _ in range(2000):
+        move = random_move(flat, n, rng)
+        if move is None:
+            continue
+        flat.two_opt_move(*move)
+        two_level.two_opt_move(*move)
+        assert edges(two_level) == edges(flat)
+    order = two_level.to_list()
+    assert sorted(order) == list(range(n))
+    for k, city in enumerate(order):
+        assert two_level.next(city) == order[(k + 1) % n]
+        assert two_level.prev(city) == order[k - 1]
+    for _ in range(200):
+        a, b, c = rng.sample(range(n), 3)
+        i, j, k = order.index(a), order.index(b), order.index(c)
+        assert two_level.between(a, b, c) == ((j - i) % n <= (k - i) % n)
+
+
+@pytest.mark.parametrize('tour_class', [ArrayTour, TwoLevelTour])
+def test_rollback_restores_the_tour(tour_class):
+    rng = random.Random(1)
+    n = 60
+    route = rng.sample(range(n), n)
+    tour = tour_class(route)
+    original = edges(tour)
+    tour.journal = []
+    for _ in range(300):
+        move = random_move(tour, n, rng)
+        if move is not None:
+            tour.two_opt_move(*move)
+    tour.rollback(0)
+    assert edges(tour) == original
+
+
+def test_array_tour_reverses_the_shorter_side():
+    rng = random.Random(2)
+    n = 51
+    tour = ArrayTour(rng.sample(range(n), n))
+    for _ in range(500):
+        first, last = rng.sample(range(n), 2)
+        before = tour.to_list()
+        # the route rotated to start at `first`, with first..last reversed in place
+        start = before.index(first)
+        rotated = before[start:] + before[:start]
+        length = rotated.index(last) + 1
+        expected = ArrayTour(rotated[:length][::-1] + rotated[length:])
+        tour.reverse(first, last)
+        after = tour.to_list()
+        assert edges(tour) == edges(expected)
+        assert all(tour.position[city] == k for k, city in enumerate(after))
+        # whichever side is shorter is the one rewritten
+        assert sum(x != y for x, y in zip(before, after)) <= n // 2 + 1
@@ -0,0 +1,5 @@
+import sys
+
+from tsp.cli import main
+
+sys.exit(main())
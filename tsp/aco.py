@@ -0,0 +1,327 @@
+import numpy as np
+
+from tsp.candidates import matrix_neighbors
+from tsp.distance_matrix import nearest_distances, population_lengths, tour_length
+from tsp.local_search import descend
+from tsp.pheromones import DensePheromones, SparsePheromones
+from tsp.progress import reporter
+from tsp.tour import make_tour
+
+# Three engines share the tour construction below:
+#   'as'   Ant System: every ant deposits q / length after global evaporation.
+#   'mmas' MAX-MIN Ant System: only the iteration-best ant deposits (the
+#          best-so-far one every best_every iterations), trails are kept
+#          within [tau_min, tau_max] derived from the best length, and they
+#          are reset to tau_max after restart_after iterations without an
+#          improvement.
+#   'acs'  Ant Colony System: with probability `exploit` an ant takes the most
+#          attractive move instead of sampling one, every edge an ant takes is
+#          pulled towards tau0 as it goes (local_rate), and only the best-so-far
+#          tour evaporates and is reinforced.
+# rho defaults to what each engine is usually run with.
+DEFAULT_RHO = {'as': 0.5, 'mmas': 0.2, 'acs': 0.1}
+
+
+# Edges shorter than this (cities at the same coordinates, which real TSPLIB
+# files have) get the heuristic of an edge this long rather than an infinite one.
+MIN_DISTANCE = 1e-9
+
+
+def heuristic_matrix(dist_matrix, beta):
+    return (1.0 / np.maximum(dist_matrix, MIN_DISTANCE)) ** beta
+
+
+def heuristic_entries(dist_matrix, rows, columns, beta):
+    # heuristic_matrix(dist_matrix, beta)[rows, columns] without the full matrix
+    return heuristic_matrix(np.asarray(dist_matrix[rows, columns], dtype=np.float64), beta)
+
+
+def nearest_neighbor_bound(dist_matrix, neighbors=None):
+    # the sum of every city's distance to its nearest neighbour, a lower bound on
+    # the tour length that sets the starting trail levels of MMAS and ACS
+    return float(nearest_distances(dist_matrix, neighbors).sum())
+
+
+def sample_rows(weights, allowed, exploit=0.0):
+    # one column per row with probability proportional to its weight; with
+    # probability `exploit` the heaviest column instead. Columns that are not
+    # `allowed` must have weight 0; a row whose weights are all 0 (the trails
+    # can underflow on long runs) is sampled uniformly over its allowed columns.
+    empty = ~(weights.sum(axis=1) > 0.0)
+    if empty.any():
+        weights = weights.copy()
+        weights[empty] = allowed[empty]
+    cumulative = np.cumsum(weights, axis=1)
+    draws = np.random.random(len(weights)) * cumulative[:, -1]
+    choices = np.argmax(cumulative > draws[:, None], axis=1)
+    if exploit:
+        greedy = np.random.random(len(weights)) < exploit
+        choices[greedy] = weights[greedy].argmax(axis=1)
+    return choices
+
+
+def construct_tours(n, n_ants, row_attractiveness, candidate_attractiveness=None, neighbors=None, start=None,
+                    bias=None, exploit=0.0, on_step=None):
+    # row_attractiveness(cities, unvisited) is the attractiveness of every move
+    # out of each of `cities`, a len(cities) x n array that is 0 wherever the
+    # matching row of `unvisited` is False; candidate_attractiveness(cities) the
+    # same for the moves to neighbors[cities] only, visited or not. start: a city every ant
+    # starts from instead of a random one; bias: (cities, factors) as
+    # Constraints.rank_bias returns it, factors[r, step] on the attractiveness
+    # of visiting cities[r] at a step; exploit: see sample_rows;
+    # on_step(previous, current) is called with the edges the ants just took,
+    # the closing ones included
+    ants = np.arange(n_ants)
+    routes = np.empty((n_ants, n), dtype=np.intp)
+    visited = np.zeros((n_ants, n), dtype=bool)
+
+    current = np.random.randint(n, size=n_ants) if start is None else np.full(n_ants, start)
+    routes[:, 0] = current
+    visited[ants, current] = True
+
+    # all ants take their k-th step together: one masked gather and one
+    # inverse-CDF draw per step for the whole colony
+    if bias is not None:
+        column = np.ones(n)
+    for step in range(1, n):
+        if bias is not None:
+            column[bias[0]] = bias[1][:, step]
+        if neighbors is None:
+            weights = row_attractiveness(current, ~visited)
+            if bias is not None:
+                weights *= column
+            current = sample_rows(weights, ~visited, exploit)
+        else:
+            # choose among the unvisited candidates first; only ants whose
+            # candidates are all visited fall back to the full row
+            candidates = neighbors[current]
+            weights = candidate_attractiveness(current)
+            if bias is not None:
+                weights *= column[candidates]
+            unvisited = ~visited[ants[:, None], candidates]
+            weights[~unvisited] = 0.0
+            # decided by the mask, not the weights: an unvisited candidate
+            # whose weight underflowed to 0 is still a candidate
+            exhausted = ~unvisited.any(axis=1)
+            weights[exhausted] = 1.0
+            following = candidates[ants, sample_rows(weights, unvisited, exploit)]
+            if exhausted.any():
+                stuck = np.flatnonzero(exhausted)
+                fallback = row_attractiveness(current[stuck], ~visited[stuck])
+                if bias is not None:
+                    fallback *= column
+                following[stuck] = sample_rows(fallback, ~visited[stuck], exploit)
+            current = following
+        if on_step is not None:
+            on_step(routes[:, step - 1], current)
+        routes[:, step] = current
+        visited[ants, current] = True
+    if on_step is not None:
+        on_step(current, routes[:, 0])
+
+    return routes
+
+
+def ant_colony_optimization(dist_matrix, n_ants=30, n_iterations=100, alpha=1, beta=5, rho=None, q=100,
+                            city_weights=None, neighbors=None, sparse=None, constraints=None, variant='as',
+                            exploit=0.9, local_rate=0.1, best_every=10, restart_after=50, p_best=0.05, two_opt=False,
+                            checkpoint=None, progress=None, stats=None):
+    # variant picks the engine described at the top of this module. p_best is
+    # the MMAS chance of rebuilding the best tour once the trails have
+    # converged, which sets tau_min against tau_max. two_opt runs 2-opt over
+    # every ant's tour before the tours are ranked and deposited; it shortens
+    # length alone, so with constraints an ant keeps the 2-opt tour only if the
+    # penalties do not eat the gain.
+    #
+    # With tsp.constraints.Constraints every ant starts at the depot, the step
+    # at which a city would be visited biases its choice (Constraints.rank_bias)
+    # and ants are ranked and deposit pheromone by length + penalty. Candidate
+    # lists are not used then: they would hide a distant city that is due.
+    #
+    # sparse keeps pheromone on the candidate edges only (tsp.pheromones), with
+    # O(1) evaporation and O(n k) memory; together with a tsp.distance_matrix
+    # CoordinateDistances nothing n x n is ever built. It needs candidate lists
+    # and is the default from 1000 cities on.
+    if variant not in DEFAULT_RHO:
+        raise ValueError(f'Unknown ACO variant: {variant}')
+    if rho is None:
+        rho = DEFAULT_RHO[variant]
+    n = len(dist_matrix)
+    start = None if constraints is None else constraints.depot
+    bias = None
+    if constraints is not None:
+        # the candidate lists still give the nearest-neighbour scale of the bias
+        bias_neighbors = neighbors
+        bias = constraints.rank_bias(dist_matrix, beta, bias_neighbors)
+        neighbors = None
+    if sparse is None:
+        sparse = neighbors is not None and n >= 1000
+    if sparse and neighbors is None:
+        raise ValueError('Sparse pheromones need candidate lists')
+    weights = None if city_weights is None else np.asarray(city_weights, dtype=np.float64)
+    everyone = np.arange(n)
+
+    def weighted_heuristic(beta):
+        # a weight w on city c makes every move into c w times as attractive
+        if sparse:
+            heuristic = heuristic_entries(dist_matrix, everyone[:, None], neighbors, beta)
+            return heuristic if weights is None else heuristic * weights[neighbors]
+        heuristic = heuristic_matrix(dist_matrix, beta)
+        return heuristic if weights is None else heuristic * weights[None, :]
+
+    heuristic = weighted_heuristic(beta)
+
+    def mmas_bounds(length):
+        high = q / (rho * length)
+        decay = p_best ** (1.0 / n)
+        return high * (1.0 - decay) / (max(n / 2 - 1, 1) * decay), high
+
+    # MMAS starts every trail at (an overestimate of) tau_max, ACS at tau0
+    estimate = nearest_neighbor_bound(dist_matrix, neighbors) if variant != 'as' else None
+    tau0 = q / (n * estimate) if variant == 'acs' else None
+
+    state = checkpoint.load('aco') if checkpoint is not None else None
+    if state is None:
+        if variant == 'mmas':
+            initial = q / (rho * estimate)
+        elif variant == 'acs':
+            initial = tau0
+        else:
+            initial = 1.0
+        pheromones = SparsePheromones(neighbors, initial) if sparse else DensePheromones(n, initial)
+        if variant == 'mmas':
+            pheromones.set_bounds(*mmas_bounds(estimate))
+        best_route = None
+        best_distance = float('inf')
+        first_iteration = 0
+        stale = 0
+        completed = 0
+    else:
+        pheromones = state['pheromones']
+        best_route = state['best_route']
+        best_distance = state['best_distance']
+        first_iteration = state['iteration']
+        stale = state['stale']
+        completed = first_iteration
+
+    if two_opt:
+        dist = dist_matrix.tolist()
+        candidate_lists = (matrix_neighbors(dist_matrix) if neighbors is None else neighbors).tolist()
+
+    def row_attractiveness(cities, unvisited):
+        if sparse:
+            # only reached once every candidate is visited, and all other edges
+            # carry the same (absent) trail, so the heuristic alone decides;
+            # computed for the unvisited cities only
+            rows = np.zeros(unvisited.shape)
+            for k, city in enumerate(cities):
+                columns = np.flatnonzero(unvisited[k])
+                rows[k, columns] = heuristic_entries(dist_matrix, city, columns, beta)
+                if weights is not None:
+                    rows[k, columns] *= weights[columns]
+            return rows
+        if attractiveness is None:
+            trails = pheromones.matrix[cities]
+            rows = (trails if alpha == 1 else trails ** alpha) * heuristic[cities]
+        else:
+            rows = attractiveness[cities]
+        rows[~unvisited] = 0.0
+        return rows
+
+    def candidate_attractiveness(cities):
+        if sparse:
+            trails = pheromones.trails(cities)
+            return (trails if alpha == 1 else trails ** alpha) * heuristic[cities]
+        columns = neighbors[cities]
+        if attractiveness is None:
+            trails = pheromones.matrix[cities[:, None], columns]
+            return (trails if alpha == 1 else trails ** alpha) * heuristic[cities[:, None], columns]
+        return attractiveness[cities[:, None], columns]
+
+    def local_update(previous, current):
+        pheromones.blend(previous, current, local_rate, tau0)
+
+    progress = reporter('aco', progress)
+    for iteration in range(first_iteration, n_iterations):
+        # ACS changes the trails while the ants walk, so it reads them as it goes
+        attractiveness = None
+        if not sparse and variant != 'acs':
+            trails = pheromones.matrix
+            attractiveness = (trails if alpha == 1 else trails ** alpha) * heuristic
+        if variant == 'acs':
+            routes = construct_tours(n, n_ants, row_attractiveness, candidate_attractiveness, neighbors, start, bias,
+                                     exploit, local_update)
+        else:
+            routes = construct_tours(n, n_ants, row_attractiveness, candidate_attractiveness, neighbors, start, bias)
+        if two_opt and n >= 5:
+            improved = routes.copy()
+            for a in range(n_ants):
+                tour = make_tour(routes[a].tolist())
+                descend(tour, dist, candidate_lists, tour.to_list(), or_opt=False)
+                improved[a] = tour.to_list()
+            if constraints is not None:
+                # an ant keeps the 2-opt tour only where it is no worse with penalties
+                shorter = (population_lengths(dist_matrix, improved) + constraints.population_penalties(improved) <=
+                           population_lengths(dist_matrix, routes) + constraints.population_penalties(routes))
+                routes[shorter] = improved[shorter]
+            else:
+                routes = improved
+        next_cities = np.roll(routes, -1, axis=1)
+        distances = dist_matrix[routes, next_cities].sum(axis=1)
+        if constraints is not None:
+            distances += constraints.population_penalties(routes)
+
+        ant = np.argmin(distances)
+        if distances[ant] < best_distance:
+            best_distance = distances[ant].item()
+            best_route = routes[ant].tolist()
+            stale = 0
+            if variant == 'mmas':
+                pheromones.set_bounds(*mmas_bounds(best_distance))
+        else:
+            stale += 1
+
+        if variant == 'as':
+            pheromones.evaporate(rho)
+            pheromones.deposit(routes, q / distances)
+        elif variant == 'mmas':
+            pheromones.evaporate(rho)
+            if best_every and (iteration + 1) % best_every == 0:
+                pheromones.deposit(np.array([best_route]), [q / best_distance])
+            else:
+                pheromones.deposit(routes[ant:ant + 1], q / distances[ant:ant + 1])
+            if stale >= restart_after:
+                pheromones.reset(pheromones.bounds[1])
+                stale = 0
+        else:
+            best = np.array(best_route)
+            pheromones.blend(best, np.roll(best, -1), rho, q / best_distance)
+        completed = iteration + 1
+
+        if checkpoint is not None and checkpoint.due():
+            checkpoint.save('aco', {'iteration': completed, 'pheromones': pheromones, 'best_route': best_route,
+                                    'best_distance': best_distance, 'stale': stale})
+
+        if progress is not None:
+            if progress.emit(iteration + 1, distances[ant], best_distance, route=best_route,
+                             pheromone=pheromones.summary(), variant=variant, alpha=alpha, beta=beta, rho=rho):
+                break
+            if progress.updates:
+                alpha = progress.updates.pop('alpha', alpha)
+                rho = progress.updates.pop('rho', rho)
+                q = progress.updates.pop('q', q)
+                exploit = progress.updates.pop('exploit', exploit)
+                if 'beta' in progress.updates:
+                    beta = progress.updates.pop('beta')
+                    heuristic = weighted_heuristic(beta)
+                    if constraints is not None:
+                        bias = constraints.rank_bias(dist_matrix, beta, bias_neighbors)
+
+    if stats is not None:
+        stats['evaluations'] = n_ants * completed
+        stats['unit'] = 'tours'
+    if constraints is not None:
+        # 2-opt may have turned the tour away from the depot
+        best_route = constraints.from_depot(best_route)
+        return tour_length(dist_matrix, best_route), best_route
+    return best_distance, best_route
@@ -0,0 +1,289 @@
+import math
+import random
+import time
+
+import numpy as np
+
+from tsp.candidates import candidate_swap, candidate_two_opt
+from tsp.constraints import swap_penalty_delta, two_opt_penalty_delta
+from tsp.distance_matrix import tour_length
+from tsp.moves import swap_delta, apply_swap, two_opt_delta
+from tsp.progress import reporter
+from tsp.tour import make_tour
+
+
+def simulated_annealing(dist_matrix, initial_temperature, cooling_rate, max_iterations, neighbors=None,
+                        constraints=None, checkpoint=None, progress=None, stats=None):
+    # with tsp.constraints.Constraints the search minimises length + penalty and
+    # the route returned starts at the depot
+    dist = dist_matrix.tolist()
+    if neighbors is not None:
+        neighbors = neighbors.tolist()
+    if constraints is not None:
+        penalty = constraints.penalty_rows()
+        depot = constraints.depot
+
+    state = checkpoint.load('sa') if checkpoint is not None else None
+    if state is None:
+        current_route = list(range(len(dist)))
+        random.shuffle(current_route)
+        current_distance = tour_length(dist_matrix, current_route)
+        if constraints is not None:
+            current_distance += constraints.route_penalty(current_route)
+        best_route = current_route[:]
+        best_distance = current_distance
+        temperature = initial_temperature
+        first_iteration = 0
+    else:
+        current_route = state['current_route']
+        current_distance = state['current_distance']
+        best_route = state['best_route']
+        best_distance = state['best_distance']
+        temperature = state['temperature']
+        first_iteration = state['iteration']
+    position = [0] * len(current_route)
+    for k, city in enumerate(current_route):
+        position[city] = k
+
+    progress = reporter('sa', progress, every=max(1, max_iterations // 200))
+    accepted = 0
+    evaluations = first_iteration
+    for iteration in range(first_iteration, max_iterations):
+        evaluations += 1
+        if neighbors is None:
+            i, j = random.sample(range(len(current_route)), 2)
+        else:
+            i, j = candidate_swap(current_route, position, neighbors)
+        delta_distance = swap_delta(dist, current_route, i, j)
+        if constraints is not None:
+            delta_distance += swap_penalty_delta(penalty, current_route, position, depot, i, j)
+
+        if delta_distance < 0 or random.random() < math.exp(-delta_distance / temperature):
+            apply_swap(current_route, i, j, position)
+            current_distance += delta_distance
+            accepted += 1
+
+            if current_distance < best_distance:
+                best_route = current_route[:]
+                best_distance = current_distance
+
+        temperature *= cooling_rate
+
+        if temperature < 1e-8:
+            break
+
+        if checkpoint is not None and checkpoint.due():
+            checkpoint.save('sa', {'iteration': iteration + 1, 'current_route': current_route,
+                                   'current_distance': current_distance, 'best_route': best_route,
+                                   'best_distance': best_distance, 'temperature': temperature})
+
+        if progress is not None and progress.due(iteration + 1):
+            if progress.emit(iteration + 1, current_distance, best_distance, accepted, best_route,
+                             temperature=temperature, cooling_rate=cooling_rate):
+                break
+            accepted = 0
+            if progress.updates:
+                temperature = progress.updates.pop('temperature', temperature)
+                cooling_rate = progress.updates.pop('cooling_rate', cooling_rate)
+
+    if stats is not None:
+        stats['evaluations'] = evaluations
+        stats['unit'] = 'moves'
+    if constraints is not None:
+        best_route = constraints.from_depot(best_route)
+    return tour_length(dist_matrix, best_route), best_route
+
+
+# adaptive_annealing is driven by a time budget instead of an iteration count.
+# The temperature is a function of the fraction of the current cooling cycle
+# that has elapsed, so every schedule ends at the final temperature exactly when
+# the budget runs out. Moves are candidate 2-opt moves; a move is accepted when
+# its delta is below T * -ln(u), and those thresholds are drawn for a whole batch
+# of moves at once instead of calling exp() for every uphill move.
+
+
+def geometric_temperature(start, final, fraction):
+    return start * (final / start) ** fraction
+
+
+def lundy_mees_temperature(start, final, fraction):
+    # T_k+1 = T_k / (1 + beta T_k), i.e. 1/T grows linearly; beta is chosen so
+    # that the final temperature is reached at the end of the cycle
+    return 1.0 / (1.0 / start + fraction * (1.0 / final - 1.0 / start))
+
+
+SCHEDULES = {
+    'geometric': geometric_temperature,
+    'lundy-mees': lundy_mees_temperature,
+    'adaptive': None,
+}
+
+
+def calibrate_temperatures(dist, tour, neighbors, acceptance=0.8, samples=1000):
+    # Initial and final temperatures from the uphill deltas of sampled moves: the
+    # initial one accepts an average uphill move with probability `acceptance`,
+    # the final one accepts even a small (10th percentile) one only 0.1% of the time.
+    n = len(dist)
+    uphill = []
+    for _ in range(samples):
+        move = candidate_two_opt(tour, n, neighbors)
+        if move is None:
+            continue
+        a, b, c, d = move
+        delta = two_opt_delta(dist, a, b, c, d)
+        if delta > 0:
+            uphill.append(delta)
+    if not uphill:
+        return 1.0, 1e-3
+    initial = sum(uphill) / len(uphill) / -math.log(acceptance)
+    final = float(np.percentile(uphill, 10)) / math.log(1000.0)
+    return initial, min(final, initial / 10.0)
+
+
+def adaptive_annealing(dist_matrix, time_limit=10.0, schedule='lundy-mees', initial_temperature=None,
+                       final_temperature=None, initial_acceptance=0.8, final_acceptance=0.001, reheat_after=0.1,
+                       reheat=0.3, batch_size=1000, neighbors=None, route=None, constraints=None, checkpoint=None,
+                       progress=None, stats=None):
+    # schedule is one of SCHEDULES; 'adaptive' steers the temperature so the
+    # acceptance rate follows a geometric decay from initial_acceptance to
+    # final_acceptance. When the best tour has not improved for reheat_after of
+    # the budget, the search restarts from the best tour with a new cooling cycle
+    # that starts at reheat times the initial temperature. With constraints the
+    # tour is an ArrayTour, whose array order gives the ranks.
+    if schedule not in SCHEDULES:
+        raise ValueError(f"Unknown schedule {schedule!r}, expected one of {', '.join(SCHEDULES)}")
+    dist = dist_matrix.tolist()
+    n = len(dist)
+    if neighbors is not None:
+        neighbors = neighbors.tolist()
+    two_level = None
+    if constraints is not None:
+        penalty = constraints.penalty_rows()
+        depot = constraints.depot
+        two_level = False
+
+    state = checkpoint.load('asa') if checkpoint is not None else None
+    if state is None:
+        if route is None:
+            route = list(range(n))
+            random.shuffle(route)
+        tour = make_tour(route, two_level)
+        current_distance = tour_length(dist_matrix, route)
+        if constraints is not None:
+            current_distance += constraints.route_penalty(route)
+        best_route = list(route)
+        best_distance = current_distance
+        calibrated = calibrate_temperatures(dist, tour, neighbors, initial_acceptance)
+        initial_temperature = initial_temperature or calibrated[0]
+        final_temperature = final_temperature or calibrated[1]
+        start_temperature = temperature = initial_temperature
+        cycle_start = 0.0
+        last_improvement = 0.0
+        elapsed = 0.0
+        evaluations = 0
+        reheats = 0
+    else:
+        tour = state['tour']
+        current_distance = state['current_distance']
+        best_route = state['best_route']
+        best_distance = state['best_distance']
+        initial_temperature = state['initial_temperature']
+        start_temperature = state['start_temperature']
+        final_temperature = state['final_temperature']
+        temperature = state['temperature']
+        cycle_start = state['cycle_start']
+        last_improvement = state['last_improvement']
+        elapsed = state['elapsed']
+        evaluations = state['evaluations']
+        reheats = state['reheats']
+    # best_route is only copied when the search is about to leave a best tour
+    at_best = current_distance <= best_distance
+    cooling = SCHEDULES[schedule]
+    clock = time.perf_counter() - elapsed
+
+    progress = reporter('asa', progress)
+    next_report = elapsed
+    accepted = 0
+    batches = 0
+    while elapsed < time_limit:
+        thresholds = (-temperature * np.log(1.0 - np.random.random(batch_size))).tolist()
+        batch_accepted = 0
+        batch_scored = 0
+        for threshold in thresholds:
+            move = candidate_two_opt(tour, n, neighbors)
+            if move is None:
+                continue
+            batch_scored += 1
+            a, b, c, d = move
+            delta = two_opt_delta(dist, a, b, c, d)
+            if constraints is not None:
+                delta += two_opt_penalty_delta(penalty, tour, depot, b, c)
+            if delta < threshold:
+                if at_best and delta > 0:
+                    best_route = tour.to_list()
+                    at_best = False
+                tour.two_opt_move(a, b, c, d)
+                current_distance += delta
+                batch_accepted += 1
+                if current_distance < best_distance - 1e-9:
+                    best_distance = current_distance
+                    at_best = True
+                    last_improvement = elapsed
+        evaluations += batch_scored
+        accepted += batch_accepted
+        batches += 1
+        elapsed = time.perf_counter() - clock
+
+        if elapsed - last_improvement > reheat_after * time_limit and elapsed < time_limit:
+            # stagnation: back to the best tour, and cool down again over what is left
+            if not at_best:
+                tour = make_tour(best_route, two_level)
+                current_distance = best_distance
+                at_best = True
+            start_temperature = max(reheat * initial_temperature, final_temperature)
+            cycle_start = elapsed
+            last_improvement = elapsed
+            temperature = start_temperature
+            reheats += 1
+        elif cooling is not None:
+            fraction = min(1.0, (elapsed - cycle_start) / (time_limit - cycle_start))
+            temperature = cooling(start_temperature, final_temperature, fraction)
+        else:
+            fraction = min(1.0, elapsed / time_limit)
+            target = initial_acceptance * (final_acceptance / initial_acceptance) ** fraction
+            rate = batch_accepted / max(1, batch_scored)
+            temperature *= 0.95 if rate > target else 1 / 0.95
+
+        if checkpoint is not None and checkpoint.due():
+            if at_best:
+                best_route = tour.to_list()
+            checkpoint.save('asa', {'tour': tour, 'current_distance': current_distance, 'best_route': best_route,
+                                    'best_distance': best_distance, 'initial_temperature': initial_temperature,
+                                    'start_temperature': start_temperature,
+                                    'final_temperature': final_temperature, 'temperature': temperature,
+                                    'cycle_start': cycle_start, 'last_improvement': last_improvement,
+                                    'elapsed': elapsed, 'evaluations': evaluations, 'reheats': reheats})
+
+        if progress is not None and elapsed >= next_report:
+            next_report = elapsed + time_limit / 200
+            route = tour.to_list() if at_best else best_route
+            if progress.emit(evaluations, current_distance, best_distance, accepted, route,
+                             temperature=temperature, reheats=reheats):
+                break
+            accepted = 0
+            if 'temperature' in progress.updates:
+                # a new cooling cycle from the requested temperature
+                start_temperature = progress.updates.pop('temperature')
+                temperature = start_temperature
+                cycle_start = elapsed
+            time_limit = progress.updates.pop('time_limit', time_limit)
+
+    if at_best:
+        best_route = tour.to_list()
+    if constraints is not None:
+        best_route = constraints.from_depot(best_route)
+    if stats is not None:
+        stats['evaluations'] = evaluations
+        stats['unit'] = 'moves'
+        stats['reheats'] = reheats
+    return tour_length(dist_matrix, best_route), best_route
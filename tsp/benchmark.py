@@ -0,0 +1,143 @@
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+
+from tsp.candidates import instance_neighbors
+from tsp.distance_matrix import instance_distance_matrix
+from tsp.loader import read_instance
+from tsp.multistart import seed_rngs
+from tsp.solvers import SOLVERS
+from tsp.workers import spawn_context
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Published optimal tour lengths (TSPLIB rounding) for instances worth dropping in next to input.txt.
+KNOWN_OPTIMA = {
+    'att48': 10628, 'berlin52': 7542, 'bier127': 118282, 'ch130': 6110, 'ch150': 6528, 'eil51': 426,
+    'eil76': 538, 'eil101': 629, 'kroA100': 21282, 'kroB100': 22141, 'kroC100': 20749, 'kroD100': 21294,
+    'kroE100': 22068, 'lin105': 14379, 'pr76': 108159, 'rat99': 1211, 'rd100': 7910, 'st70': 675,
+    'a280': 2579, 'pcb442': 50778, 'ulysses16': 6859, 'ulysses22': 7013,
+}
+DEFAULT_INSTANCES = {'berlin52': 'input.txt'}
+DEFAULT_SOLVERS = ['tabu', 'ga', 'aco', 'mmas', 'acs', 'sa', 'asa', 'hill', 'lk']
+
+
+def _trial(task):
+    solver_name, path, seed, neighbor_count = task
+    instance = read_instance(path)
+    dist_matrix = instance_distance_matrix(instance)
+    neighbors = instance_neighbors(instance, dist_matrix, neighbor_count)
+    if resource is None:
+        tracemalloc.start()
+    seed_rngs(seed)
+    stats = {}
+    start = time.perf_counter()
+    distance, route = SOLVERS[solver_name](dist_matrix, neighbors, stats)
+    wall_time = time.perf_counter() - start
+    if resource is None:
+        peak_memory = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+    else:
+        # ru_maxrss is in KiB on Linux and bytes on macOS
+        unit = 2 ** 20 if sys.platform == 'darwin' else 2 ** 10
+        peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / unit
+    return {
+        'seed': seed,
+        'distance': distance,
+        'time': wall_time,
+        'evaluations': stats.get('evaluations'),
+        'unit': stats.get('unit'),
+        'peak_memory_mb': peak_memory,
+    }
+
+
+def summarize(instance, solver_name, optimum, trials):
+    distances = [trial['distance'] for trial in trials]
+    times = [trial['time'] for trial in trials]
+    evaluations = [trial['evaluations'] for trial in trials]
+    summary = {
+        'instance': instance,
+        'solver': solver_name,
+        'optimum': optimum,
+        'trials': trials,
+        'best_distance': min(distances),
+        'mean_distance': statistics.mean(distances),
+        'mean_time': statistics.mean(times),
+        'evaluations_per_second': (sum(evaluations) / sum(times)) if None not in evaluations and sum(times) else None,
+        'unit': trials[0]['unit'],
+        'peak_memory_mb': max(trial['peak_memory_mb'] for trial in trials),
+        'best_gap': None,
+        'mean_gap': None,
+    }
+    if optimum:
+        summary['best_gap'] = 100 * (summary['best_distance'] - optimum) / optimum
+        summary['mean_gap'] = 100 * (summary['mean_distance'] - optimum) / optimum
+    return summary
+
+
+def run_benchmark(instances, solvers, trials=5, seed=0, neighbor_count=10):
+    # every trial runs alone in a fresh worker process so timings do not contend
+    # and the peak-memory figure belongs to that trial only
+    results = []
+    context = spawn_context()
+    with context.Pool(1, maxtasksperchild=1) as pool:
+        for instance, path in instances.items():
+            for solver_name in solvers:
+                tasks = [(solver_name, path, seed + trial, neighbor_count) for trial in range(trials)]
+                results.append(summarize(instance, solver_name, KNOWN_OPTIMA.get(instance), pool.map(_trial, tasks)))
+    return results
+
+
+def format_table(results):
+    def cell(value, width, spec):
+        return (format(value, spec) if value is not None else '-').rjust(width)
+
+    lines = [f"{'instance':<12} {'solver':<8} {'best':>11} {'mean':>11} {'gap %':>7} {'mean gap %':>10} "
+             f"{'time (s)':>9} {'evals/s':>11} {'unit':<7} {'peak MB':>8}"]
+    for result in results:
+        lines.append(f"{result['instance']:<12} {result['solver']:<8} {result['best_distance']:>11.1f} "
+                     f"{result['mean_distance']:>11.1f} {cell(result['best_gap'], 7, '.2f')} "
+                     f"{cell(result['mean_gap'], 10, '.2f')} {result['mean_time']:>9.3f} "
+                     f"{cell(result['evaluations_per_second'], 11, ',.0f')} {result['unit'] or '-':<7} "
+                     f"{result['peak_memory_mb']:>8.1f}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m tsp.benchmark',
+                                     description='Compare the solvers on TSPLIB instances.')
+    parser.add_argument('--instance', action='append', metavar='[NAME=]PATH',
+                        help='instance to run, repeatable; NAME defaults to the file\'s NAME field and the gap is '
+                             'reported when it has a known optimum (default: berlin52=input.txt)')
+    parser.add_argument('--solver', action='append', choices=DEFAULT_SOLVERS,
+                        help='solver to run, repeatable (default: all)')
+    parser.add_argument('--trials', type=int, default=5, help='trials per solver and instance (default: 5)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed of the first trial; trial k uses seed + k (default: 0)')
+    parser.add_argument('--neighbors', type=int, default=10, help='candidate list size per city (default: 10)')
+    parser.add_argument('--json', help='also write the full results to this JSON file')
+    args = parser.parse_args(argv)
+
+    instances = DEFAULT_INSTANCES
+    if args.instance:
+        instances = {}
+        for spec in args.instance:
+            name, _, path = spec.rpartition('=')
+            instances[name or read_instance(path)['name']] = path
+    results = run_benchmark(instances, args.solver or DEFAULT_SOLVERS, args.trials, args.seed, args.neighbors)
+
+    print(format_table(results))
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,104 @@
+import random
+
+import numpy as np
+
+
+def kd_leaves(coordinates, leaf_size=32):
+    # Splits the points at the median of their wider side until at most
+    # leaf_size remain: leaves hold about the same number of points however
+    # clustered the instance is. Returns the leaves as index arrays and their
+    # bounding boxes.
+    leaves = []
+    pending = [np.arange(len(coordinates))]
+    while pending:
+        members = pending.pop()
+        if len(members) <= leaf_size:
+            leaves.append(members)
+            continue
+        axis = int(np.ptp(coordinates[members], axis=0).argmax())
+        half = len(members) // 2
+        split = np.argpartition(coordinates[members, axis], half)
+        pending += [members[split[:half]], members[split[half:]]]
+    low = np.array([coordinates[members].min(axis=0) for members in leaves])
+    high = np.array([coordinates[members].max(axis=0) for members in leaves])
+    return leaves, low, high
+
+
+def nearest_neighbors(points, k=10, leaf_size=32):
+    coordinates = np.asarray(points, dtype=np.float64)
+    n = len(coordinates)
+    k = min(k, n - 1)
+    leaves, low, high = kd_leaves(coordinates, leaf_size)
+
+    # All points of a leaf are queried together: the other leaves are scanned
+    # nearest box first until the next box is farther than every point's k-th
+    # nearest city so far.
+    neighbors = np.empty((n, k), dtype=np.int32)
+    for leaf, members in enumerate(leaves):
+        gaps = np.maximum(0.0, np.maximum(low - high[leaf], low[leaf] - high))
+        box_distances = np.einsum('ij,ij->i', gaps, gaps)
+        order = np.argsort(box_distances, kind='stable')
+        best = np.full((len(members), k), np.inf)
+        found = np.full((len(members), k), -1, dtype=np.intp)
+        for other in order:
+            if box_distances[other] > best.max():
+                break
+            candidates = leaves[other]
+            offsets = coordinates[members][:, None, :] - coordinates[candidates][None, :, :]
+            squared = np.einsum('ijk,ijk->ij', offsets, offsets)
+            if other == leaf:
+                squared[members[:, None] == candidates[None, :]] = np.inf
+            squared = np.hstack((best, squared))
+            indices = np.hstack((found, np.broadcast_to(candidates, (len(members), len(candidates)))))
+            nearest = np.argpartition(squared, k - 1, axis=1)[:, :k]
+            best = np.take_along_axis(squared, nearest, axis=1)
+            found = np.take_along_axis(indices, nearest, axis=1)
+        # nearest first, ties by index
+        ranked = np.lexsort((found, best), axis=1)
+        neighbors[members] = np.take_along_axis(found, ranked, axis=1)
+
+    return neighbors
+
+
+def matrix_neighbors(dist_matrix, k=10):
+    # for instances given only as an explicit matrix, without coordinates
+    k = min(k, len(dist_matrix) - 1)
+    ranked = dist_matrix.copy()
+    np.fill_diagonal(ranked, np.inf)
+    nearest = np.argpartition(ranked, k - 1, axis=1)[:, :k]
+    order = np.argsort(np.take_along_axis(ranked, nearest, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(nearest, order, axis=1).astype(np.int32)
+
+
+def instance_neighbors(instance, dist_matrix, k=10):
+    # the k-d tree works on coordinates, but GEO/ATT/explicit lengths are not plain
+    # Euclidean, so those rank candidates by the distance matrix itself
+    if instance['edge_weight_type'] in ('EUC_2D', 'CEIL_2D') and instance['coordinates'] is not None:
+        return nearest_neighbors(instance['coordinates'], k)
+    return matrix_neighbors(dist_matrix, k)
+
+
+# Picks a random city a and one of its candidates c and returns the swap
+# indices that make (a, c) a tour edge. `neighbors` and `position` are plain
+# lists so the per-move lookups stay cheap.
+def candidate_swap(route, position, neighbors):
+    i = random.randrange(len(route))
+    candidates = neighbors[route[i]]
+    city = candidates[random.randrange(len(candidates))]
+    return (i + 1) % len(route), position[city]
+
+
+def candidate_two_opt(tour, n, neighbors):
+    # a 2-opt move that makes (a, c) a tour edge, with c among the candidates of a
+    # (any city without candidate lists), or None if the pair is unusable
+    a = random.randrange(n)
+    if neighbors is None:
+        c = random.randrange(n)
+    else:
+        candidates = neighbors[a]
+        c = candidates[random.randrange(len(candidates))]
+    b = tour.next(a)
+    d = tour.next(c)
+    if c == a or c == b or d == a:
+        return None
+    return a, b, c, d
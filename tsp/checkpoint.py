@@ -0,0 +1,43 @@
+import os
+import pickle
+import random
+import time
+
+import numpy as np
+
+# A checkpoint file holds one pickled dict: the name of the solver that wrote it,
+# that solver's loop state and the states of both global RNGs, so a resumed run
+# draws exactly the numbers the interrupted one would have. It is written to a
+# temporary file and moved into place, so a pre-empted run never leaves a
+# half-written checkpoint behind.
+
+
+class Checkpoint:
+    def __init__(self, path, interval=60.0, resume=False):
+        self.path = path
+        self.interval = interval
+        self.resume = resume
+        self.last_save = time.monotonic()
+
+    def load(self, solver):
+        # the saved loop state with the RNGs restored, or None to start afresh
+        if not self.resume or not os.path.exists(self.path):
+            return None
+        with open(self.path, 'rb') as file:
+            saved = pickle.load(file)
+        if saved['solver'] != solver:
+            raise ValueError(f"Checkpoint {self.path} was written by {saved['solver']}, not {solver}")
+        random.setstate(saved['random'])
+        np.random.set_state(saved['numpy'])
+        return saved['state']
+
+    def due(self):
+        return time.monotonic() - self.last_save >= self.interval
+
+    def save(self, solver, state):
+        saved = {'solver': solver, 'state': state, 'random': random.getstate(), 'numpy': np.random.get_state()}
+        temporary = f'{self.path}.{os.getpid()}.tmp'
+        with open(temporary, 'wb') as file:
+            pickle.dump(saved, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, self.path)
+        self.last_save = time.monotonic()
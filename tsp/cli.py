@@ -0,0 +1,175 @@
+import argparse
+import sys
+
+from tsp.candidates import instance_neighbors, nearest_neighbors
+from tsp.checkpoint import Checkpoint
+from tsp.constraints import Constraints
+from tsp.decomposition import PARTITIONS, decomposition
+from tsp.distance_matrix import CoordinateDistances, instance_distance_matrix
+from tsp.loader import read_instance
+from tsp.local_search import local_search
+from tsp.multistart import multi_start, format_report, seed_rngs
+from tsp.progress import JsonLinesSink
+from tsp.solvers import CONSTRAINED, SOLVERS
+
+
+def write_tour(path, route, distance):
+    with open(path, 'w') as file:
+        file.write(f'TYPE : TOUR\nDIMENSION : {len(route)}\nCOMMENT : Length {distance:.2f}\nTOUR_SECTION\n')
+        for city in route:
+            file.write(f'{city + 1}\n')
+        file.write('-1\nEOF\n')
+
+
+def city_list(text):
+    # "3,17,42" -> the 0-based cities 2, 16 and 41
+    return [int(city) - 1 for city in text.split(',')]
+
+
+def stops_and_cities(text):
+    # "STOPS:CITIES" or "EARLIEST:LATEST:CITIES" -> ([stops...], cities)
+    *stops, cities = text.split(':')
+    return [int(stop) for stop in stops], city_list(cities)
+
+
+def build_constraints(args, n):
+    # the tsp.constraints.Constraints the options ask for, or None without any;
+    # raises ValueError for a city that is not in the instance
+    if args.depot is None and not (args.priority or args.within or args.window):
+        return None
+    constraints = Constraints(n, depot=(args.depot or 1) - 1)
+    cities = [constraints.depot]
+    if args.priority:
+        constraints.prioritize(args.priority, args.priority_weight)
+        cities += args.priority
+    for (stops,), within in args.within or ():
+        constraints.visit_within(within, stops)
+        cities += within
+    for (earliest, latest), window in args.window or ():
+        constraints.visit_window(window, earliest, latest)
+        cities += window
+    unknown = [city + 1 for city in cities if not 0 <= city < n]
+    if unknown:
+        raise ValueError(f"no such cities: {', '.join(map(str, unknown))}")
+    return constraints
+
+
+def decomposed(cluster_solver, points, cluster_size, partition, processes):
+    # a solver with the usual signature that runs tsp.decomposition; the
+    # "distance matrix" it is given is a CoordinateDistances
+    def solver(dist_matrix, neighbors, checkpoint=None, progress=None):
+        return decomposition(points, cluster_size, partition, cluster_solver, processes, neighbors, progress)
+    return solver
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m tsp',
+                                     description='Solve a TSP instance without the pygame front end.')
+    parser.add_argument('solver', nargs='?', default='lk', choices=list(SOLVERS),
+                        help='default: lk, iterated Lin-Kernighan, which scales best to large instances')
+    parser.add_argument('--input', default='input.txt',
+                        help='TSPLIB .tsp file or "id x y" coordinate list (default: input.txt)')
+    parser.add_argument('--output', help='write the tour to this file in TSPLIB TOUR format')
+    parser.add_argument('--tsplib', action='store_true',
+                        help='round EUC_2D edge lengths to integers as TSPLIB does (other types always are)')
+    parser.add_argument('--neighbors', type=int, default=10, help='candidate list size per city (default: 10)')
+    parser.add_argument('--seed', type=int, help='random seed')
+    parser.add_argument('--runs', type=int, default=1, help='number of independently seeded runs (default: 1)')
+    parser.add_argument('--processes', type=int, help='worker processes for --runs (default: all cores)')
+    parser.add_argument('--target', type=float, help='stop the remaining runs once a tour this short is found')
+    parser.add_argument('--polish', choices=['2opt', '3opt'],
+                        help='finish the best tour with 2-opt/Or-opt local search (3opt adds segment exchanges)')
+    parser.add_argument('--checkpoint', help='periodically save the solver state to this file')
+    parser.add_argument('--checkpoint-interval', type=float, default=60,
+                        help='seconds between checkpoints (default: 60)')
+    parser.add_argument('--resume', action='store_true', help='continue from the --checkpoint file if it exists')
+    parser.add_argument('--events', help='append progress events to this file as JSON lines ("-" for stderr)')
+    parser.add_argument('--decompose', type=int, metavar='SIZE',
+                        help='for very large EUC_2D instances: solve clusters of about SIZE cities in parallel with '
+                             'the chosen solver and stitch them, without an n x n distance matrix')
+    parser.add_argument('--partition', choices=list(PARTITIONS), default='curve',
+                        help='how --decompose clusters the cities: Hilbert curve runs or k-means (default: curve)')
+    routing = parser.add_argument_group(
+        'constraints', 'penalties on the stop at which cities are visited, counted from the depot; cities are '
+                       'numbered from 1 as in the printed tour. Supported by: ' + ', '.join(CONSTRAINED))
+    routing.add_argument('--depot', type=int, metavar='CITY', help='where the route starts (default: 1)')
+    routing.add_argument('--priority', type=city_list, metavar='CITIES',
+                         help='comma-separated cities that cost --priority-weight for every stop they wait')
+    routing.add_argument('--priority-weight', type=float, default=10.0, metavar='WEIGHT', help='default: 10')
+    routing.add_argument('--within', type=stops_and_cities, action='append', metavar='STOPS:CITIES',
+                         help='visit these cities within the first STOPS stops (repeatable)')
+    routing.add_argument('--window', type=stops_and_cities, action='append', metavar='EARLIEST:LATEST:CITIES',
+                         help='visit these cities between stops EARLIEST and LATEST (repeatable)')
+    args = parser.parse_args(argv)
+    if args.runs > 1 and args.solver in ('islands', 'pt'):
+        parser.error(f'{args.solver} already uses a process pool; run it with --runs 1')
+    if args.runs > 1 and args.checkpoint:
+        parser.error('--checkpoint saves a single run; use it with --runs 1')
+    if args.resume and not args.checkpoint:
+        parser.error('--resume needs --checkpoint')
+    if args.runs > 1 and args.events:
+        parser.error('--events follows a single run; use it with --runs 1')
+    if args.decompose and (args.runs > 1 or args.checkpoint or args.tsplib):
+        parser.error('--decompose runs once, without checkpoints, on unrounded Euclidean distances')
+    if args.decompose and args.solver in ('islands', 'pt'):
+        parser.error(f'{args.solver} runs its own process pool and cannot solve the --decompose clusters')
+    if any(len(stops) != 1 for stops, _ in args.within or ()):
+        parser.error('--within takes STOPS:CITIES')
+    if any(len(stops) != 2 for stops, _ in args.window or ()):
+        parser.error('--window takes EARLIEST:LATEST:CITIES')
+
+    instance = read_instance(args.input)
+    if args.decompose:
+        if instance['edge_weight_type'] != 'EUC_2D' or instance['coordinates'] is None:
+            parser.error('--decompose needs EUC_2D coordinates')
+        points = instance['coordinates']
+        dist_matrix = CoordinateDistances(points)
+        neighbors = nearest_neighbors(points, args.neighbors)
+        solver = decomposed(SOLVERS[args.solver], points, args.decompose, args.partition, args.processes)
+    else:
+        dist_matrix = instance_distance_matrix(instance, tsplib=args.tsplib)
+        neighbors = instance_neighbors(instance, dist_matrix, args.neighbors)
+        solver = SOLVERS[args.solver]
+    try:
+        constraints = build_constraints(args, len(dist_matrix))
+    except ValueError as error:
+        parser.error(str(error))
+    solver_options = {}
+    if constraints is not None:
+        if args.solver not in CONSTRAINED or args.decompose or args.polish:
+            parser.error(f"constraints need one of {', '.join(CONSTRAINED)}, without --decompose or --polish")
+        solver_options['constraints'] = constraints
+
+    if args.runs > 1:
+        report = multi_start(solver, args.runs, dist_matrix, neighbors, processes=args.processes, seed=args.seed,
+                             target=args.target, **solver_options)
+        print(format_report(report), file=sys.stderr)
+        distance, route = report['best_distance'], report['best_route']
+    else:
+        if args.seed is not None:
+            seed_rngs(args.seed)
+        checkpoint = None
+        if args.checkpoint:
+            checkpoint = Checkpoint(args.checkpoint, args.checkpoint_interval, args.resume)
+        if args.events == '-':
+            distance, route = solver(dist_matrix, neighbors, checkpoint=checkpoint, progress=JsonLinesSink(sys.stderr),
+                                     **solver_options)
+        elif args.events:
+            with open(args.events, 'a') as events:
+                distance, route = solver(dist_matrix, neighbors, checkpoint=checkpoint,
+                                         progress=JsonLinesSink(events), **solver_options)
+        else:
+            distance, route = solver(dist_matrix, neighbors, checkpoint=checkpoint, **solver_options)
+
+    if args.polish:
+        polished, route = local_search(dist_matrix, route, neighbors, three_opt=args.polish == '3opt')
+        print(f'polish: {distance:.2f} -> {polished:.2f}', file=sys.stderr)
+        distance = polished
+
+    if constraints is not None:
+        print(f'penalty: {constraints.route_penalty(route):.2f}', file=sys.stderr)
+    print(f'{distance:.2f}')
+    print(' '.join(str(city + 1) for city in route))
+    if args.output:
+        write_tour(args.output, route, distance)
+    return 0
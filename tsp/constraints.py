@@ -0,0 +1,169 @@
+import numpy as np
+
+from tsp.distance_matrix import nearest_distances
+
+# Priority, must-visit-early and visit-window constraints for a route read
+# forward from a depot. The rank of a city is the number of stops before it
+# (0 for the depot). Every constraint is a penalty on the rank at which a city
+# is visited, and all of them are summed into one row per constrained city when
+# they are declared: an m x n table for m constrained cities, so a handful of
+# priorities on a 100k-city instance costs a handful of rows. A solver's hot
+# loop looks up penalty[city][rank] for the constrained cities only instead of
+# testing constraints. Penalties are in distance units and solvers minimise
+# length + penalty. Windows are counted in stops, not travel time, which is
+# what keeps them expressible as such a table.
+
+
+class Constraints:
+    def __init__(self, n, depot=0):
+        self.n = n
+        self.depot = depot
+        # cities[r] is the city whose penalties by rank are table[r]
+        self.cities = np.zeros(0, dtype=np.intp)
+        self.table = np.zeros((0, n))
+        self.row_of = {}
+
+    def rows(self, cities):
+        # the table rows of `cities`, adding zero rows for cities not constrained yet
+        cities = np.atleast_1d(np.asarray(cities, dtype=np.intp))
+        new = [city for city in dict.fromkeys(cities.tolist()) if city not in self.row_of]
+        if new:
+            for city in new:
+                self.row_of[city] = len(self.row_of)
+            self.cities = np.concatenate((self.cities, np.asarray(new, dtype=np.intp)))
+            self.table = np.vstack((self.table, np.zeros((len(new), self.n))))
+        return np.array([self.row_of[city] for city in cities.tolist()], dtype=np.intp)
+
+    def prioritize(self, cities, weight=10.0):
+        # every stop a priority city has to wait for costs `weight`
+        rows = self.rows(cities)
+        self.table[rows] += weight * np.arange(self.n)
+
+    def visit_window(self, cities, earliest=0, latest=None, weight=1000.0):
+        # `weight` for every stop a city is visited before `earliest` or after `latest`
+        ranks = np.arange(self.n)
+        early = np.maximum(earliest - ranks, 0)
+        late = np.zeros_like(ranks) if latest is None else np.maximum(ranks - latest, 0)
+        rows = self.rows(cities)
+        self.table[rows] += weight * (early + late)
+
+    def visit_within(self, cities, stops, weight=1000.0):
+        # must-visit-early: each of `cities` among the first `stops` stops
+        self.visit_window(cities, latest=stops, weight=weight)
+
+    def penalty_rows(self):
+        # {city: penalties by rank} for the constrained cities, as the plain
+        # lists the delta functions below take
+        return {city: self.table[row].tolist() for city, row in self.row_of.items()}
+
+    def ranks(self, routes):
+        # the rank of every entry of a route or a population of routes
+        routes = np.asarray(routes)
+        origin = np.argmax(routes == self.depot, axis=-1)
+        return (np.arange(routes.shape[-1]) - np.expand_dims(origin, -1)) % routes.shape[-1]
+
+    def route_penalty(self, route):
+        return self.population_penalties(np.asarray(route)[None, :])[0].item()
+
+    def population_penalties(self, routes):
+        routes = np.asarray(routes)
+        if not len(self.cities):
+            return np.zeros(len(routes))
+        positions = np.empty_like(routes)
+        np.put_along_axis(positions, routes, np.arange(routes.shape[1]), axis=1)
+        ranks = (positions[:, self.cities] - positions[:, [self.depot]]) % routes.shape[1]
+        return self.table[np.arange(len(self.cities)), ranks].sum(axis=1)
+
+    def from_depot(self, route):
+        # the same tour, rotated to start at the depot
+        route = list(route)
+        start = route.index(self.depot)
+        return route[start:] + route[:start]
+
+    def rank_bias(self, dist_matrix, beta, neighbors=None):
+        # For tour construction: (cities, factors), where factors[r, k] scales the
+        # attractiveness of visiting cities[r] at step k; every other city keeps
+        # a factor of 1. The cost of postponing city c from stop k is taken per
+        # stop over the next m stops, m being the number of constrained cities:
+        # (penalty[c, k + m] - penalty[c, k]) / m. Looking only one stop ahead,
+        # cities sharing a deadline would all be pushed at the last stop, where
+        # only one of them fits. That cost is treated as a detour saved (or
+        # added, if negative) on a typical nearest-neighbour edge, so the factor
+        # is what the ACO heuristic (1 / d) ** beta makes of it.
+        nearest = nearest_distances(dist_matrix, neighbors)
+        typical = max(float(np.median(nearest)), 1e-12)
+        stops = np.arange(self.n)
+        ahead = np.minimum(stops + len(self.cities), self.n - 1)
+        postponing = (self.table[:, ahead] - self.table) / np.maximum(ahead - stops, 1)
+        factors = ((typical + np.maximum(postponing, 0)) / (typical + np.maximum(-postponing, 0))) ** beta
+        return self.cities, factors
+
+
+# Penalty deltas to add to the length deltas of a swap (tsp.moves.swap_delta)
+# or a 2-opt move. `penalty` is Constraints.penalty_rows(); cities without a row
+# cost nothing wherever they are, so both deltas only visit constrained cities.
+
+def swap_penalty_delta(penalty, route, position, depot, i, j):
+    n = len(route)
+    a = route[i]
+    b = route[j]
+    origin = position[depot]
+    if a == depot or b == depot:
+        # the depot itself moves, so every rank shifts
+        shifted = j if a == depot else i
+        delta = 0.0
+        for city, row in penalty.items():
+            k = position[city]
+            new = j if city == a else i if city == b else k
+            delta += row[(new - shifted) % n] - row[(k - origin) % n]
+        return delta
+    rank_i = (i - origin) % n
+    rank_j = (j - origin) % n
+    delta = 0.0
+    row = penalty.get(a)
+    if row is not None:
+        delta += row[rank_j] - row[rank_i]
+    row = penalty.get(b)
+    if row is not None:
+        delta += row[rank_i] - row[rank_j]
+    return delta
+
+
+def two_opt_penalty_delta(penalty, tour, depot, b, c):
+    # The penalty change of tour.reverse(b, c) on an ArrayTour, which reverses
+    # whichever side of the tour is shorter; the ranks follow the array's
+    # forward direction. Costs O(min(constrained cities, length of that side)).
+    if not penalty:
+        return 0.0
+    order = tour.order
+    position = tour.position
+    n = len(order)
+    i = position[b]
+    j = position[c]
+    length = (j - i) % n + 1
+    if 2 * length > n:
+        i, j = (j + 1) % n, (i - 1) % n
+        length = n - length
+    origin = position[depot]
+    delta = 0.0
+    if (origin - i) % n < length:
+        # the depot is in the reversed part: every rank changes
+        moved = (i + j - origin) % n
+        for city, row in penalty.items():
+            k = position[city]
+            new = (i + j - k) % n if (k - i) % n < length else k
+            delta += row[(new - moved) % n] - row[(k - origin) % n]
+        return delta
+    if len(penalty) < length:
+        for city, row in penalty.items():
+            old = position[city]
+            if (old - i) % n < length:
+                delta += row[(i + j - old - origin) % n] - row[(old - origin) % n]
+        return delta
+    for k in range(length):
+        old = (i + k) % n
+        row = penalty.get(order[old])
+        if row is not None:
+            new = (j - k) % n
+            delta += row[(new - origin) % n] - row[(old - origin) % n]
+    return delta
@@ -0,0 +1,180 @@
+import random
+
+import numpy as np
+
+# Recombination operators for permutation-encoded tours. Parents are 1-D NumPy
+# int arrays and the child is written into `out`, a row of a preallocated
+# offspring array, so a generation does not allocate a route per child. All
+# operators share the (parent1, parent2, out, dist_matrix) signature; only the
+# edge assembly crossover needs the distances.
+
+
+def order_crossover(parent1, parent2, out, dist_matrix=None):
+    # OX: a slice of parent1 in place, the remaining cities in parent2's order
+    n = len(parent1)
+    start, end = sorted(random.sample(range(n), 2))
+    out[start:end] = parent1[start:end]
+    taken = np.zeros(n, dtype=bool)
+    taken[parent1[start:end]] = True
+    rest = parent2[~taken[parent2]]
+    out[:start] = rest[:start]
+    out[end:] = rest[start:]
+
+
+def adjacency(parent):
+    # the two tour neighbours of every city
+    table = np.empty((len(parent), 2), dtype=np.int64)
+    table[parent, 0] = np.roll(parent, 1)
+    table[parent, 1] = np.roll(parent, -1)
+    return table
+
+
+def edge_recombination(parent1, parent2, out, dist_matrix=None):
+    # ERX: follow parent edges, always moving to the neighbour with the fewest
+    # edges left; a random unvisited city when the current one has none
+    n = len(parent1)
+    edges = [set(row) for row in np.hstack((adjacency(parent1), adjacency(parent2))).tolist()]
+    unvisited = list(range(n))
+    slot = list(range(n))
+    city = int(parent1[0])
+    route = []
+    for _ in range(n):
+        route.append(city)
+        # remove the city from the unvisited list in O(1)
+        last = unvisited.pop()
+        if last != city:
+            unvisited[slot[city]] = last
+            slot[last] = slot[city]
+        for other in edges[city]:
+            edges[other].discard(city)
+        options = edges[city]
+        if options:
+            fewest = min(len(edges[other]) for other in options)
+            city = random.choice([other for other in options if len(edges[other]) == fewest])
+        elif unvisited:
+            city = unvisited[random.randrange(len(unvisited))]
+    out[:] = route
+
+
+def ab_cycles(parent1, parent2):
+    # Decomposes the edges of parent1 and parent2 that are not shared into
+    # alternating cycles. Each cycle is a closed walk [v0, v1, ..., v0] whose
+    # edges (v0, v1), (v2, v3), ... come from parent1 and the others from parent2.
+    a_edges = adjacency(parent1).tolist()
+    b_edges = adjacency(parent2).tolist()
+    for city in range(len(a_edges)):
+        for other in list(a_edges[city]):
+            if other in b_edges[city]:
+                a_edges[city].remove(other)
+                b_edges[city].remove(other)
+
+    cycles = []
+    for start in range(len(a_edges)):
+        while a_edges[start]:
+            # every city has as many parent1 as parent2 edges left, so the walk
+            # can only stop when it re-enters `start` through a parent2 edge
+            walk = [start]
+            city = start
+            use_a = True
+            while True:
+                edges = a_edges if use_a else b_edges
+                other = edges[city].pop(random.randrange(len(edges[city])))
+                edges[other].remove(city)
+                walk.append(other)
+                city = other
+                if not use_a and city == start:
+                    break
+                use_a = not use_a
+            cycles.append(walk)
+    return cycles
+
+
+def edge_assembly(parent1, parent2, out, dist_matrix):
+    # EAX with a single AB-cycle: swap one alternating cycle of parent1 edges for
+    # parent2 edges, then join the resulting subtours with the cheapest 2-opt
+    # style reconnection, smallest subtour first
+    cycles = [walk for walk in ab_cycles(parent1, parent2) if len(walk) > 3]
+    if not cycles:
+        out[:] = parent1
+        return
+    walk = random.choice(cycles)
+    edges = adjacency(parent1).tolist()
+    for k in range(0, len(walk) - 1, 2):
+        a, b = walk[k], walk[k + 1]
+        edges[a].remove(b)
+        edges[b].remove(a)
+    for k in range(1, len(walk) - 1, 2):
+        a, b = walk[k], walk[k + 1]
+        edges[a].append(b)
+        edges[b].append(a)
+
+    n = len(edges)
+    succ = np.empty(n, dtype=np.int64)
+    component = np.full(n, -1, dtype=np.int64)
+    members = {}
+    for start in range(n):
+        if component[start] >= 0:
+            continue
+        label = len(members)
+        members[label] = []
+        previous = edges[start][0]
+        city = start
+        while True:
+            component[city] = label
+            members[label].append(city)
+            first, second = edges[city]
+            following = first if first != previous else second
+            succ[city] = following
+            previous = city
+            city = following
+            if city == start:
+                break
+
+    while len(members) > 1:
+        label = min(members, key=lambda key: len(members[key]))
+        u = np.array(members[label])
+        su = succ[u]
+        v = np.flatnonzero(component != label)
+        sv = succ[v]
+        removed = dist_matrix[u, su][:, None] + dist_matrix[v, sv][None, :]
+        # keep: add (u, sv) and (v, su); flip: add (u, v) and (su, sv)
+        keep = dist_matrix[np.ix_(u, sv)] + dist_matrix[np.ix_(su, v)] - removed
+        flip = dist_matrix[np.ix_(u, v)] + dist_matrix[np.ix_(su, sv)] - removed
+        i, j = np.unravel_index(keep.argmin(), keep.shape)
+        k, m = np.unravel_index(flip.argmin(), flip.shape)
+        if keep[i, j] <= flip[k, m]:
+            succ[u[i]] = sv[j]
+            succ[v[j]] = su[i]
+            joined = component[v[j]]
+        else:
+            # reverse the smaller subtour, after which (su, u) is the edge to cut
+            succ[su] = u
+            succ[su[k]] = sv[m]
+            succ[v[m]] = u[k]
+            joined = component[v[m]]
+        component[u] = joined
+        members[joined] += members.pop(label)
+
+    succ = succ.tolist()
+    city = int(parent1[0])
+    route = []
+    for _ in range(n):
+        route.append(city)
+        city = succ[city]
+    out[:] = route
+
+
+def mutate(individual, rate=0.01):
+    # each gene is swapped with a random position with probability `rate`; the
+    # number of swaps is drawn once instead of rolling a die per gene
+    n = len(individual)
+    for i in random.sample(range(n), np.random.binomial(n, rate)):
+        j = random.randrange(n)
+        individual[i], individual[j] = individual[j], individual[i]
+
+
+CROSSOVERS = {
+    'ox': order_crossover,
+    'erx': edge_recombination,
+    'eax': edge_assembly,
+}
@@ -0,0 +1,152 @@
+import random
+
+import numpy as np
+
+from tsp.candidates import nearest_neighbors
+from tsp.distance_matrix import CoordinateDistances, build_distance_matrix, tour_length
+from tsp.lin_kernighan import lin_kernighan
+from tsp.local_search import local_search
+from tsp.progress import reporter
+from tsp.workers import spawn_context
+
+# Divide and conquer for instances far too large for an n x n matrix: the
+# cities are split into clusters of a few hundred along a Hilbert curve (or by
+# k-means, with the clusters ordered along the curve), every cluster is solved
+# on its own small matrix in a worker process, the cluster tours are cut open
+# and chained in curve order, and 2-opt/Or-opt local search over the whole tour
+# repairs the seams and the borders between neighbouring clusters, which no
+# cluster solver could see across.
+# Outside the workers nothing is larger than O(n k): coordinates, candidate
+# lists, the tour, and distances computed from coordinates on demand.
+
+
+def hilbert_index(points, bits=16):
+    # position of every point along a Hilbert curve over the bounding box
+    coordinates = np.asarray(points, dtype=np.float64)
+    origin = coordinates.min(axis=0)
+    extent = max(np.ptp(coordinates, axis=0).max(), 1e-12)
+    side = 1 << bits
+    scaled = np.minimum(((coordinates - origin) / extent * side).astype(np.int64), side - 1)
+    x = scaled[:, 0].copy()
+    y = scaled[:, 1].copy()
+    index = np.zeros(len(coordinates), dtype=np.int64)
+    s = side >> 1
+    while s:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        index += s * s * ((3 * rx) ^ ry)
+        # rotate the quadrant so the curve continues where it left off
+        flip = ~ry & rx
+        x = np.where(flip, side - 1 - x, x)
+        y = np.where(flip, side - 1 - y, y)
+        x, y = np.where(~ry, y, x), np.where(~ry, x, y)
+        s >>= 1
+    return index
+
+
+def curve_clusters(points, cluster_size):
+    # consecutive runs of cluster_size cities along the Hilbert curve
+    order = np.argsort(hilbert_index(points), kind='stable')
+    return [order[start:start + cluster_size] for start in range(0, len(order), cluster_size)]
+
+
+def kmeans_clusters(points, cluster_size, iterations=10, chunk_size=4096):
+    # Lloyd's k-means with k = n / cluster_size, seeded from the curve clusters;
+    # points are assigned in chunks so the distances to the centroids never take
+    # more than chunk_size x k memory. Clusters come back in curve order.
+    coordinates = np.asarray(points, dtype=np.float64)
+    centroids = np.array([coordinates[members].mean(axis=0) for members in curve_clusters(points, cluster_size)])
+    labels = np.empty(len(coordinates), dtype=np.int64)
+    for _ in range(iterations):
+        for start in range(0, len(coordinates), chunk_size):
+            chunk = coordinates[start:start + chunk_size]
+            squared = ((chunk[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2)
+            labels[start:start + chunk_size] = squared.argmin(axis=1)
+        counts = np.bincount(labels, minlength=len(centroids))
+        for axis in range(2):
+            sums = np.bincount(labels, weights=coordinates[:, axis], minlength=len(centroids))
+            # an empty cluster keeps its centroid and is dropped below
+            centroids[:, axis] = np.where(counts > 0, sums / np.maximum(counts, 1), centroids[:, axis])
+    order = np.argsort(labels, kind='stable')
+    bounds = np.searchsorted(labels[order], np.arange(len(centroids) + 1))
+    clusters = [order[bounds[k]:bounds[k + 1]] for k in range(len(centroids)) if bounds[k + 1] > bounds[k]]
+    centres = np.array([coordinates[members].mean(axis=0) for members in clusters])
+    return [clusters[k] for k in np.argsort(hilbert_index(centres), kind='stable')]
+
+
+PARTITIONS = {
+    'curve': curve_clusters,
+    'kmeans': kmeans_clusters,
+}
+
+
+def _solve_cluster(solver, coordinates, seed):
+    # the tour of one cluster, as indices into `coordinates`
+    if len(coordinates) <= 3:
+        return list(range(len(coordinates)))
+    random.seed(seed)
+    np.random.seed(seed)
+    dist_matrix = build_distance_matrix(coordinates)
+    _, route = solver(dist_matrix, nearest_neighbors(coordinates, 10))
+    return [int(city) for city in route]
+
+
+def distances_to(coordinates, point, cities):
+    offsets = coordinates[cities] - point
+    return np.hypot(offsets[:, 0], offsets[:, 1])
+
+
+def open_tour(dist, coordinates, route, previous, following):
+    # Cuts the cyclic tour `route` at the edge (u, v) and orients the resulting
+    # path so that previous -> first city and last city -> following (both
+    # points) add the least: the cheapest way to chain this cluster in.
+    route = np.asarray(route)
+    successors = np.roll(route, -1)
+    kept = -dist[route, successors]
+    forward = distances_to(coordinates, previous, successors) + distances_to(coordinates, following, route) + kept
+    backward = distances_to(coordinates, previous, route) + distances_to(coordinates, following, successors) + kept
+    k = int(np.argmin(np.minimum(forward, backward)))
+    path = np.roll(route, -(k + 1))
+    # forward runs v .. u; backward runs u .. v
+    return path.tolist() if forward[k] <= backward[k] else path[::-1].tolist()
+
+
+def decomposition(points, cluster_size=200, partition='curve', solver=lin_kernighan, processes=None, neighbors=None,
+                  progress=None, stats=None):
+    # solver(dist_matrix, neighbors) -> (distance, route) solves each cluster; any
+    # of tsp.solvers.SOLVERS fits. It must be a module-level function so it can be
+    # sent to the spawned workers. Returns (distance, route) like every solver.
+    coordinates = np.asarray(points, dtype=np.float64)
+    n = len(coordinates)
+    dist = CoordinateDistances(coordinates)
+    clusters = PARTITIONS[partition](coordinates, cluster_size)
+    progress = reporter('decomposition', progress)
+
+    tasks = [(solver, coordinates[members], random.getrandbits(32)) for members in clusters]
+    with spawn_context().Pool(processes) as pool:
+        tours = pool.starmap(_solve_cluster, tasks)
+
+    centres = [coordinates[members].mean(axis=0) for members in clusters]
+    route = []
+    previous = centres[-1]
+    for k, (members, tour) in enumerate(zip(clusters, tours)):
+        path = open_tour(dist, coordinates, members[tour], previous, centres[(k + 1) % len(clusters)])
+        route += path
+        previous = coordinates[path[-1]]
+    stitched = tour_length(dist, route)
+    if progress is not None:
+        progress.emit(1, stitched, stitched, route=route, stage='stitched', clusters=len(clusters))
+
+    if neighbors is None:
+        neighbors = nearest_neighbors(coordinates, 8)
+    # the cluster tours are already locally optimal, so the don't-look bits
+    # settle quickly everywhere but along the borders
+    distance, route = local_search(dist, route, neighbors)
+    if progress is not None:
+        progress.emit(2, distance, distance, route=route, stage='polished', clusters=len(clusters))
+    if stats is not None:
+        stats['evaluations'] = n
+        stats['unit'] = 'cities'
+        stats['clusters'] = len(clusters)
+        stats['stitched'] = stitched
+    return distance, route
@@ -0,0 +1,118 @@
+import math
+
+import numpy as np
+
+
+def build_distance_matrix(points, tsplib=False):
+    coordinates = np.asarray(points, dtype=np.float64)
+    x = coordinates[:, 0]
+    y = coordinates[:, 1]
+    matrix = np.hypot(x[:, None] - x[None, :], y[:, None] - y[None, :])
+    if tsplib:
+        # TSPLIB EUC_2D: nint(sqrt(dx^2 + dy^2)), so tour lengths match the published optima
+        matrix = np.floor(matrix + 0.5)
+    return np.ascontiguousarray(matrix)
+
+
+def tour_length(matrix, route):
+    route = np.asarray(route)
+    return matrix[route, np.roll(route, -1)].sum().item()
+
+
+def population_lengths(matrix, routes):
+    # lengths of every row of a population x cities route array in one gather
+    return matrix[routes, np.roll(routes, -1, axis=1)].sum(axis=1)
+
+
+def nearest_distances(dist_matrix, neighbors=None, block=256):
+    # every city's distance to its nearest other city: from the first candidate
+    # when there are candidate lists, else scanned `block` rows at a time, so
+    # nothing n x n is built (dist_matrix may be a CoordinateDistances)
+    n = len(dist_matrix)
+    if neighbors is not None:
+        return dist_matrix[np.arange(n), np.asarray(neighbors)[:, 0]]
+    everyone = np.arange(n)
+    nearest = np.empty(n)
+    for start in range(0, n, block):
+        rows = everyone[start:start + block]
+        distances = np.array(dist_matrix[rows[:, None], everyone[None, :]], dtype=np.float64)
+        distances[np.arange(len(rows)), rows] = np.inf
+        nearest[rows] = distances.min(axis=1)
+    return nearest
+
+
+class CoordinateRow:
+    __slots__ = ('x', 'y', 'a')
+
+    def __init__(self, x, y, a):
+        self.x = x
+        self.y = y
+        self.a = a
+
+    def __getitem__(self, b):
+        return math.hypot(self.x[self.a] - self.x[b], self.y[self.a] - self.y[b])
+
+
+class CoordinateDistances:
+    # Euclidean distances computed from the coordinates on demand, for instances
+    # too large for an n x n matrix. It answers dist[a][b] for scalar lookups and
+    # dist[rows, cols] for NumPy gathers (so tour_length works), and tolist()
+    # returns the object itself, so solvers that take `dist_matrix.tolist()` rows
+    # can use it as long as they are given candidate lists.
+    def __init__(self, points):
+        self.coordinates = np.asarray(points, dtype=np.float64)
+        self.x = self.coordinates[:, 0].tolist()
+        self.y = self.coordinates[:, 1].tolist()
+
+    def __len__(self):
+        return len(self.x)
+
+    def __getitem__(self, index):
+        if isinstance(index, tuple):
+            offsets = self.coordinates[index[0]] - self.coordinates[index[1]]
+            return np.hypot(offsets[..., 0], offsets[..., 1])
+        return CoordinateRow(self.x, self.y, index)
+
+    def tolist(self):
+        return self
+
+
+def geo_distance_matrix(points):
+    # TSPLIB GEO: coordinates are DDD.MM latitude/longitude on an idealised sphere
+    coordinates = np.asarray(points, dtype=np.float64)
+    degrees = np.trunc(coordinates)
+    radians = np.pi * (degrees + 5.0 * (coordinates - degrees) / 3.0) / 180.0
+    latitude = radians[:, 0]
+    longitude = radians[:, 1]
+    q1 = np.cos(longitude[:, None] - longitude[None, :])
+    q2 = np.cos(latitude[:, None] - latitude[None, :])
+    q3 = np.cos(latitude[:, None] + latitude[None, :])
+    cosine = np.clip(0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3), -1.0, 1.0)
+    matrix = np.floor(6378.388 * np.arccos(cosine) + 1.0)
+    np.fill_diagonal(matrix, 0.0)
+    return np.ascontiguousarray(matrix)
+
+
+def att_distance_matrix(points):
+    # TSPLIB ATT (pseudo-Euclidean): nint(r), rounded up whenever nint(r) < r
+    coordinates = np.asarray(points, dtype=np.float64)
+    x = coordinates[:, 0]
+    y = coordinates[:, 1]
+    r = np.sqrt(((x[:, None] - x[None, :]) ** 2 + (y[:, None] - y[None, :]) ** 2) / 10.0)
+    t = np.floor(r + 0.5)
+    return np.ascontiguousarray(np.where(t < r, t + 1.0, t))
+
+
+def instance_distance_matrix(instance, tsplib=True):
+    edge_weight_type = instance['edge_weight_type']
+    if edge_weight_type == 'EXPLICIT':
+        return np.ascontiguousarray(instance['weights'], dtype=np.float64)
+    if edge_weight_type == 'GEO':
+        return geo_distance_matrix(instance['coordinates'])
+    if edge_weight_type == 'ATT':
+        return att_distance_matrix(instance['coordinates'])
+    if edge_weight_type == 'CEIL_2D':
+        return np.ceil(build_distance_matrix(instance['coordinates']))
+    if edge_weight_type == 'EUC_2D':
+        return build_distance_matrix(instance['coordinates'], tsplib=tsplib)
+    raise ValueError(f'Unsupported EDGE_WEIGHT_TYPE: {edge_weight_type}')
@@ -0,0 +1,192 @@
+import random
+from multiprocessing import cpu_count
+
+import numpy as np
+
+from tsp.crossover import CROSSOVERS, mutate
+from tsp.distance_matrix import population_lengths, tour_length
+from tsp.progress import reporter
+from tsp.workers import spawn_context
+
+# A population is a (lengths, routes) pair: routes is a population x cities int
+# array and lengths the matching tour lengths, so every route is scored exactly
+# once and the score travels with it through selection and migration. Children
+# are written into a second array of the same shape and the two are swapped
+# every generation. With tsp.constraints.Constraints the "lengths" are length +
+# penalty, so selection works on the constrained objective unchanged.
+
+
+def score(dist_matrix, routes, constraints=None):
+    lengths = population_lengths(dist_matrix, routes)
+    if constraints is not None:
+        lengths += constraints.population_penalties(routes)
+    return lengths
+
+
+def create_population(dist_matrix, size, constraints=None):
+    routes = np.random.random((size, len(dist_matrix))).argsort(axis=1)
+    return score(dist_matrix, routes, constraints), routes
+
+
+def final_route(dist_matrix, route, constraints=None):
+    # the (length, route) a solver returns for its best individual
+    route = route.tolist()
+    if constraints is not None:
+        route = constraints.from_depot(route)
+    return tour_length(dist_matrix, route), route
+
+
+def selection(lengths, count, size=3):
+    # `count` tournaments of `size` entrants drawn at once; returns the winners' indices
+    entrants = np.random.randint(0, len(lengths), (count, size))
+    return entrants[np.arange(count), lengths[entrants].argmin(axis=1)]
+
+
+def evolve(dist_matrix, population, generations, crossover='ox', on_generation=None, constraints=None):
+    # on_generation(generation, population, best) runs after every generation;
+    # a truthy return value ends the run early
+    lengths, routes = population
+    recombine = CROSSOVERS[crossover]
+    offspring = np.empty_like(routes)
+    best_index = lengths.argmin()
+    best = (lengths[best_index].item(), routes[best_index].copy())
+
+    for generation in range(generations):
+        parents = selection(lengths, len(routes) + len(routes) % 2)
+        for k in range(0, len(routes), 2):
+            parent1 = routes[parents[k]]
+            parent2 = routes[parents[k + 1]]
+            recombine(parent1, parent2, offspring[k], dist_matrix)
+            mutate(offspring[k])
+            if k + 1 < len(routes):
+                recombine(parent2, parent1, offspring[k + 1], dist_matrix)
+                mutate(offspring[k + 1])
+
+        routes, offspring = offspring, routes
+        lengths = score(dist_matrix, routes, constraints)
+        best_index = lengths.argmin()
+        if lengths[best_index] < best[0]:
+            best = (lengths[best_index].item(), routes[best_index].copy())
+        if on_generation is not None and on_generation(generation + 1, (lengths, routes), best):
+            break
+
+    return (lengths, routes), best
+
+
+def genetic_algorithm(dist_matrix, population_size, generations, crossover='ox', constraints=None, checkpoint=None,
+                      progress=None, stats=None):
+    state = checkpoint.load('ga') if checkpoint is not None else None
+    if state is None:
+        population = create_population(dist_matrix, population_size, constraints)
+        completed = 0
+        best = None
+    else:
+        population, completed, best = state['population'], state['generation'], state['best']
+    progress = reporter('ga', progress)
+    finished = generations
+
+    def on_generation(generation, population, evolved_best):
+        nonlocal finished
+        finished = completed + generation
+        overall = evolved_best if best is None or evolved_best[0] < best[0] else best
+        if checkpoint is not None and checkpoint.due():
+            checkpoint.save('ga', {'generation': completed + generation, 'population': population, 'best': overall})
+        if progress is not None:
+            lengths = population[0]
+            return progress.emit(completed + generation, lengths.min(), overall[0], route=overall[1],
+                                 mean=lengths.mean().item())
+
+    hook = on_generation if checkpoint is not None or progress is not None else None
+    population, evolved_best = evolve(dist_matrix, population, generations - completed, crossover, hook, constraints)
+    if best is None or evolved_best[0] < best[0]:
+        best = evolved_best
+    if stats is not None:
+        # the first population is scored too
+        stats['evaluations'] = population_size * (finished + 1)
+        stats['unit'] = 'tours'
+    return final_route(dist_matrix, best[1], constraints)
+
+
+def migrate(populations, migrants, topology):
+    emigrants = []
+    for lengths, routes in populations:
+        fittest = lengths.argsort()[:migrants]
+        emigrants.append((lengths[fittest], routes[fittest]))
+    islands = len(populations)
+    for target in range(islands):
+        if topology == 'ring':
+            sources = [(target - 1) % islands]
+        elif topology == 'full':
+            sources = [source for source in range(islands) if source != target]
+        else:
+            raise ValueError(f'Unknown migration topology: {topology}')
+        # arrivals replace the worst residents; with more arrivals than residents
+        # (many islands, small populations) only the fittest arrivals settle
+        lengths, routes = populations[target]
+        arrival_lengths = np.concatenate([emigrants[source][0] for source in sources])
+        arrival_routes = np.concatenate([emigrants[source][1] for source in sources])
+        if len(arrival_lengths) > len(lengths):
+            fittest = arrival_lengths.argsort()[:len(lengths)]
+            arrival_lengths, arrival_routes = arrival_lengths[fittest], arrival_routes[fittest]
+        worst = lengths.argsort()[len(lengths) - len(arrival_lengths):]
+        lengths[worst] = arrival_lengths
+        routes[worst] = arrival_routes
+
+
+_worker_dist_matrix = None
+_worker_constraints = None
+
+
+def _init_worker(dist_matrix, constraints):
+    global _worker_dist_matrix, _worker_constraints
+    _worker_dist_matrix = dist_matrix
+    _worker_constraints = constraints
+
+
+def _evolve_island(population, generations, crossover, seed):
+    random.seed(seed)
+    np.random.seed(seed)
+    return evolve(_worker_dist_matrix, population, generations, crossover, constraints=_worker_constraints)
+
+
+def island_genetic_algorithm(dist_matrix, population_size, generations, islands=4, migration_interval=10,
+                             migrants=2, topology='ring', crossover='ox', processes=None, constraints=None,
+                             checkpoint=None, progress=None, stats=None):
+    state = checkpoint.load('islands') if checkpoint is not None else None
+    if state is None:
+        populations = [create_population(dist_matrix, population_size, constraints) for _ in range(islands)]
+        best = min(((lengths.min().item(), routes[lengths.argmin()].copy()) for lengths, routes in populations),
+                   key=lambda individual: individual[0])
+        completed = 0
+    else:
+        populations, best, completed = state['populations'], state['best'], state['generation']
+    progress = reporter('islands', progress)
+
+    # the distance matrix and constraints are shipped to each worker once; per epoch only the
+    # populations travel between processes
+    context = spawn_context()
+    with context.Pool(processes or min(islands, cpu_count()), initializer=_init_worker,
+                      initargs=(dist_matrix, constraints)) as pool:
+        while completed < generations:
+            epoch = min(migration_interval, generations - completed)
+            tasks = [(population, epoch, crossover, random.getrandbits(32)) for population in populations]
+            results = pool.starmap(_evolve_island, tasks)
+            populations = [population for population, _ in results]
+            for _, island_best in results:
+                if island_best[0] < best[0]:
+                    best = island_best
+            completed += epoch
+            if completed < generations:
+                migrate(populations, migrants, topology)
+            if checkpoint is not None and checkpoint.due():
+                checkpoint.save('islands', {'generation': completed, 'populations': populations, 'best': best})
+            if progress is not None:
+                current = min(lengths.min() for lengths, _ in populations)
+                mean = np.mean([lengths.mean() for lengths, _ in populations]).item()
+                if progress.emit(completed, current, best[0], route=best[1], mean=mean):
+                    break
+
+    if stats is not None:
+        stats['evaluations'] = islands * population_size * (completed + 1)
+        stats['unit'] = 'tours'
+    return final_route(dist_matrix, best[1], constraints)
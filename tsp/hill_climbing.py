@@ -0,0 +1,17 @@
+import random
+
+from tsp.local_search import local_search
+from tsp.progress import reporter
+
+
+def hill_climbing(dist_matrix, neighbors=None, stats=None, three_opt=False, progress=None):
+    # a random tour driven to a 2-opt/Or-opt local optimum; multi-start supplies
+    # the restarts. The descent takes milliseconds, so it reports once, at the end.
+    progress = reporter('hill', progress)
+    route = list(range(len(dist_matrix)))
+    random.shuffle(route)
+    stats = {} if stats is None else stats
+    distance, route = local_search(dist_matrix, route, neighbors, three_opt=three_opt, stats=stats)
+    if progress is not None:
+        progress.emit(stats['evaluations'], distance, distance, route=route)
+    return distance, route
@@ -0,0 +1,209 @@
+import random
+import time
+from collections import deque
+
+import numpy as np
+
+from tsp.candidates import matrix_neighbors
+from tsp.distance_matrix import tour_length
+from tsp.local_search import improve_or_opt
+from tsp.progress import reporter
+from tsp.tabu import edge
+from tsp.tour import make_tour
+
+# Lin-Kernighan built from sequential 2-opt moves (the "LK with flips" variant):
+# t1 stays fixed, each step breaks (t1, t2), joins t2 to a candidate t3 and
+# breaks (t3, t4), leaving (t1, t4) as the closing edge and t4 as the next t2.
+# The chain is applied as it is built and rolled back to its best closed gain.
+
+
+def nearest_neighbor_tour(dist_matrix, neighbors, start=0):
+    n = len(dist_matrix)
+    visited = np.zeros(n, dtype=bool)
+    route = [start]
+    visited[start] = True
+    city = start
+    for _ in range(n - 1):
+        for candidate in neighbors[city]:
+            if not visited[candidate]:
+                city = candidate
+                break
+        else:
+            # every candidate is taken: fall back to a full row scan
+            row = np.where(visited, np.inf, dist_matrix[city])
+            city = int(row.argmin())
+        visited[city] = True
+        route.append(city)
+    return route
+
+
+def lk_step(tour, dist, neighbors, t1, t2, max_depth):
+    # returns the gain of the best closed tour along the chain, which is left
+    # applied, and the cities whose edges changed
+    mark = len(tour.journal)
+    gain = dist[t1][t2]
+    removed = {edge(t1, t2)}
+    added = set()
+    best_gain = 1e-9
+    best_mark = mark
+    touched = [t1, t2]
+    best_touched = 0
+    for _ in range(max_depth):
+        forward = tour.next(t1) == t2
+        choice = None
+        best_value = -1.0
+        for t3 in neighbors[t2]:
+            g1 = gain - dist[t2][t3]
+            if g1 <= 0:
+                break
+            t4 = tour.prev(t3) if forward else tour.next(t3)
+            if t3 == t1 or t4 == t2 or edge(t2, t3) in removed or edge(t3, t4) in added:
+                continue
+            # look ahead: prefer the step that leaves the most gain to spend
+            value = g1 + dist[t3][t4]
+            if value > best_value:
+                best_value = value
+                choice = t3, t4, g1
+        if choice is None:
+            break
+        t3, t4, g1 = choice
+        tour.two_opt_move(t1, t2, t4, t3)
+        added.add(edge(t2, t3))
+        removed.add(edge(t3, t4))
+        touched += (t3, t4)
+        gain = g1 + dist[t3][t4]
+        closed = gain - dist[t4][t1]
+        if closed > best_gain:
+            best_gain = closed
+            best_mark = len(tour.journal)
+            best_touched = len(touched)
+        t2 = t4
+    tour.rollback(best_mark)
+    if best_mark == mark:
+        return 0.0, ()
+    return best_gain, touched[:best_touched]
+
+
+def optimize(tour, dist, neighbors, queue, queued, max_depth):
+    # LK from every city in the don't-look-bit queue, with Or-opt as a fallback
+    # for segment moves the 2-opt chain cannot express; returns the total gain
+    total = 0.0
+    while queue:
+        t1 = queue.popleft()
+        queued[t1] = False
+        touched = ()
+        for t2 in (tour.next(t1), tour.prev(t1)):
+            gain, touched = lk_step(tour, dist, neighbors, t1, t2, max_depth)
+            if touched:
+                total += gain
+                break
+        if not touched:
+            delta, touched = improve_or_opt(tour, dist, neighbors, t1)
+            total -= delta
+        if touched:
+            for city in touched:
+                if not queued[city]:
+                    queued[city] = True
+                    queue.append(city)
+    return total
+
+
+def double_bridge(tour, max_segment=50):
+    # segment-local double bridge: t1 [t2..t3] [t4..t5] t6 -> t1 [t4..t5] [t2..t3] t6,
+    # with short segments so the kick costs O(max_segment) instead of O(n)
+    n = len(tour)
+    length = min(max_segment, (n - 2) // 2)
+    t1 = random.randrange(n)
+    forward = random.random() < 0.5
+    step = tour.next if forward else tour.prev
+    t2 = step(t1)
+    t3 = t2
+    for _ in range(random.randrange(length)):
+        t3 = step(t3)
+    t4 = step(t3)
+    t5 = t4
+    for _ in range(random.randrange(length)):
+        t5 = step(t5)
+    t6 = step(t5)
+    tour.two_opt_move(t1, t2, t5, t6)
+    tour.two_opt_move(t1, t5, t4, t3)
+    tour.two_opt_move(t5, t3, t2, t6)
+    return t1, t2, t3, t4, t5, t6
+
+
+def lin_kernighan(dist_matrix, neighbors=None, max_trials=None, time_limit=None, max_depth=50, route=None,
+                  two_level=None, checkpoint=None, progress=None, stats=None):
+    dist = dist_matrix.tolist()
+    n = len(dist)
+    if neighbors is None:
+        neighbors = matrix_neighbors(dist_matrix)
+    neighbors = neighbors.tolist()
+    if route is None:
+        route = nearest_neighbor_tour(dist_matrix, neighbors, random.randrange(n))
+    if n < 4:
+        # every tour of three cities or fewer has the same length
+        if stats is not None:
+            stats['evaluations'] = 0
+            stats['unit'] = 'kicks'
+        return tour_length(dist_matrix, route), list(route)
+    if max_trials is None:
+        max_trials = n
+    if n < 8:
+        # too few cities for a double bridge with six distinct ends: one LK descent
+        max_trials = 0
+
+    state = checkpoint.load('lk') if checkpoint is not None else None
+    if state is None:
+        start = time.perf_counter()
+        tour = make_tour(route, two_level)
+        tour.journal = []
+        queue = deque(route)
+        queued = [True] * n
+        optimize(tour, dist, neighbors, queue, queued, max_depth)
+        trials = 0
+    else:
+        # between trials the don't-look-bit queue is always empty
+        start = time.perf_counter() - state['elapsed']
+        tour = state['tour']
+        queue = deque()
+        queued = [False] * n
+        trials = state['trials']
+
+    progress = reporter('lk', progress, every=max(1, max_trials // 200))
+    if progress is not None:
+        length = tour_length(dist_matrix, tour.to_list())
+        accepted = 0
+
+    # iterated LK: kick, re-optimise around the kick, keep the result unless it
+    # is worse; the journal lets a rejected trial be undone move by move
+    while trials < max_trials and (time_limit is None or time.perf_counter() - start < time_limit):
+        trials += 1
+        tour.journal.clear()
+        t1, t2, t3, t4, t5, t6 = double_bridge(tour)
+        kick = (dist[t1][t4] + dist[t5][t2] + dist[t3][t6]
+                - dist[t1][t2] - dist[t3][t4] - dist[t5][t6])
+        for city in (t1, t2, t3, t4, t5, t6):
+            if not queued[city]:
+                queued[city] = True
+                queue.append(city)
+        gain = optimize(tour, dist, neighbors, queue, queued, max_depth)
+        if kick - gain > 1e-9:
+            tour.rollback(0)
+        elif progress is not None:
+            length += kick - gain
+            accepted += 1
+        if checkpoint is not None and checkpoint.due():
+            tour.journal.clear()
+            checkpoint.save('lk', {'trials': trials, 'tour': tour, 'elapsed': time.perf_counter() - start})
+        if progress is not None and progress.due(trials):
+            # LK never accepts a longer tour, so the current one is the best
+            route = tour.to_list() if length < progress.last_best else None
+            if progress.emit(trials, length, length, accepted, route):
+                break
+            accepted = 0
+
+    if stats is not None:
+        stats['evaluations'] = trials
+        stats['unit'] = 'kicks'
+    route = tour.to_list()
+    return tour_length(dist_matrix, route), route
@@ -0,0 +1,177 @@
+import os
+import re
+
+import numpy as np
+
+SECTIONS = {'NODE_COORD_SECTION', 'EDGE_WEIGHT_SECTION', 'DISPLAY_DATA_SECTION', 'TOUR_SECTION',
+            'DEPOT_SECTION', 'DEMAND_SECTION', 'FIXED_EDGES_SECTION'}
+CHUNK_SIZE = 1 << 24
+# a word of two or more letters ends a numeric section; single letters can be exponents
+KEYWORD = re.compile(rb'[A-Za-z_]{2,}')
+
+
+def read_numbers(file):
+    # Parses whitespace-separated numbers from the current position up to the next
+    # keyword (or end of file) in large chunks, without splitting into lines, and
+    # leaves the file positioned at that keyword.
+    parts = []
+    carry = b''
+    while True:
+        offset = file.tell() - len(carry)
+        chunk = file.read(CHUNK_SIZE)
+        data = carry + chunk
+        keyword = KEYWORD.search(data)
+        if keyword is not None:
+            parts.append(np.fromstring(data[:keyword.start()], sep=' '))
+            file.seek(offset + keyword.start())
+            break
+        if not chunk:
+            parts.append(np.fromstring(data, sep=' '))
+            break
+        # keep a possibly truncated trailing token for the next chunk
+        cut = max(data.rfind(b' '), data.rfind(b'\n'), data.rfind(b'\t')) + 1
+        parts.append(np.fromstring(data[:cut], sep=' '))
+        carry = data[cut:]
+    return np.concatenate(parts) if len(parts) > 1 else parts[0]
+
+
+def explicit_matrix(values, n, edge_weight_format):
+    if edge_weight_format == 'FUNCTION':
+        raise ValueError('EDGE_WEIGHT_FORMAT FUNCTION has no explicit weights')
+    if edge_weight_format == 'FULL_MATRIX':
+        return values[:n * n].reshape(n, n).copy()
+    # for symmetric instances a column-wise triangle equals the row-wise opposite one
+    triangles = {
+        'UPPER_ROW': (np.triu_indices, 1), 'LOWER_COL': (np.triu_indices, 1),
+        'LOWER_ROW': (np.tril_indices, -1), 'UPPER_COL': (np.tril_indices, -1),
+        'UPPER_DIAG_ROW': (np.triu_indices, 0), 'LOWER_DIAG_COL': (np.triu_indices, 0),
+        'LOWER_DIAG_ROW': (np.tril_indices, 0), 'UPPER_DIAG_COL': (np.tril_indices, 0),
+    }
+    if edge_weight_format not in triangles:
+        raise ValueError(f'Unsupported EDGE_WEIGHT_FORMAT: {edge_weight_format}')
+    indices, diagonal = triangles[edge_weight_format]
+    rows, cols = indices(n, diagonal)
+    matrix = np.zeros((n, n))
+    matrix[rows, cols] = values[:len(rows)]
+    matrix[cols, rows] = values[:len(rows)]
+    return matrix
+
+
+def coordinates_from(values, columns):
+    table = values.reshape(-1, columns)
+    order = np.argsort(table[:, 0], kind='stable')
+    return np.ascontiguousarray(table[order, 1:3])
+
+
+def cache_path(path, section):
+    return f'{path}.{section}.npy'
+
+
+def load_cached(path, section):
+    cached = cache_path(path, section)
+    try:
+        if os.path.getmtime(cached) >= os.path.getmtime(path):
+            return np.load(cached)
+    except OSError:
+        pass
+    return None
+
+
+def store_cached(path, section, array):
+    cached = cache_path(path, section)
+    temporary = f'{cached}.{os.getpid()}.tmp'
+    try:
+        with open(temporary, 'wb') as file:
+            np.save(file, array)
+        os.replace(temporary, cached)
+    except OSError:
+        # a read-only instance directory just means no cache
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def expected_sections(instance):
+    if instance['edge_weight_type'] != 'EXPLICIT':
+        return ['coords']
+    if instance['display_data_type'] == 'TWOD_DISPLAY' or instance['node_coord_type'] not in (None, 'NO_COORDS'):
+        return ['weights', 'coords']
+    return ['weights']
+
+
+def read_instance(path, cache=True):
+    # Reads a TSPLIB file, or a bare "id x y" coordinate list such as input.txt.
+    # Numeric sections are cached next to the file as .npy sidecars; when they are
+    # fresh only the header is parsed.
+    instance = {
+        'name': os.path.splitext(os.path.basename(path))[0],
+        'type': 'TSP',
+        'comment': '',
+        'dimension': None,
+        'edge_weight_type': 'EUC_2D',
+        'edge_weight_format': None,
+        'node_coord_type': None,
+        'display_data_type': None,
+        'coordinates': None,
+        'weights': None,
+    }
+    fields = {'coords': 'coordinates', 'weights': 'weights'}
+    parsed = []
+
+    with open(path, 'rb') as file:
+        while True:
+            start = file.tell()
+            line = file.readline()
+            if not line:
+                break
+            text = line.decode('ascii', 'replace').strip()
+            if not text:
+                continue
+            keyword = text.split(':', 1)[0].strip().upper()
+            if keyword == 'EOF':
+                break
+            is_data = keyword in SECTIONS or ':' not in text
+            if is_data and cache and not parsed:
+                sections = expected_sections(instance)
+                arrays = [load_cached(path, section) for section in sections]
+                if all(array is not None for array in arrays):
+                    for section, array in zip(sections, arrays):
+                        instance[fields[section]] = array
+                    break
+
+            if keyword == 'NODE_COORD_SECTION' or (keyword == 'DISPLAY_DATA_SECTION'
+                                                   and instance['coordinates'] is None):
+                columns = 4 if instance['node_coord_type'] == 'THREED_COORDS' else 3
+                instance['coordinates'] = coordinates_from(read_numbers(file), columns)
+                parsed.append('coords')
+            elif keyword == 'EDGE_WEIGHT_SECTION':
+                instance['weights'] = explicit_matrix(read_numbers(file), instance['dimension'],
+                                                      instance['edge_weight_format'])
+                parsed.append('weights')
+            elif keyword in SECTIONS:
+                read_numbers(file)
+            elif ':' in text:
+                value = text.split(':', 1)[1].strip()
+                key = keyword.lower()
+                if key == 'dimension':
+                    instance[key] = int(value)
+                elif key == 'name':
+                    instance[key] = value[:-4] if value.lower().endswith('.tsp') else value
+                elif key in instance:
+                    instance[key] = value.upper() if key.endswith('_type') or key.endswith('_format') else value
+            else:
+                # no header at all: the whole file is "id x y" lines
+                file.seek(start)
+                instance['coordinates'] = coordinates_from(read_numbers(file), 3)
+                parsed.append('coords')
+
+    if cache:
+        for section in parsed:
+            store_cached(path, section, instance[fields[section]])
+    if instance['dimension'] is None:
+        source = instance['coordinates'] if instance['coordinates'] is not None else instance['weights']
+        instance['dimension'] = len(source)
+    return instance
+
+
+def load_points(path):
+    return read_instance(path)['coordinates']
@@ -0,0 +1,166 @@
+from collections import deque
+
+from tsp.candidates import matrix_neighbors
+from tsp.distance_matrix import tour_length
+from tsp.moves import two_opt_delta, or_opt_delta
+from tsp.tour import make_tour
+
+# Moves search the k-nearest candidate lists and are applied through the edge-based
+# two_opt_move of tsp.tour, so they work on either tour representation.
+
+
+def or_opt_move(tour, p, s1, s2, nx, c, d, first):
+    # move the path s1..s2 (entered from p, left to nx) between the adjacent
+    # cities c and d, with `first` (s1 or s2) next to c
+    if (tour.next(p) == s1) != (tour.next(c) == d):
+        p, s1, s2, nx = nx, s2, s1, p
+    tour.two_opt_move(p, s1, c, d)
+    tour.two_opt_move(p, c, nx, s2)
+    if first != s2:
+        tour.two_opt_move(c, s2, s1, d)
+
+
+def improve_two_opt(tour, dist, neighbors, a):
+    for succ in (True, False):
+        b = tour.next(a) if succ else tour.prev(a)
+        removed = dist[a][b]
+        for c in neighbors[a]:
+            gain = removed - dist[a][c]
+            if gain <= 0:
+                break
+            d = tour.next(c) if succ else tour.prev(c)
+            if c == b or d == a:
+                continue
+            delta = two_opt_delta(dist, a, b, c, d)
+            if delta < -1e-9:
+                if succ:
+                    tour.two_opt_move(a, b, c, d)
+                else:
+                    tour.two_opt_move(b, a, d, c)
+                return delta, (a, b, c, d)
+    return 0.0, None
+
+
+def improve_or_opt(tour, dist, neighbors, a, max_length=3):
+    n = len(tour)
+    for forward in (True, False):
+        step = tour.next if forward else tour.prev
+        back = tour.prev if forward else tour.next
+        s1 = a
+        s2 = a
+        segment = {a}
+        for length in range(1, min(max_length, n - 3) + 1):
+            if length > 1:
+                s2 = step(s2)
+                segment.add(s2)
+            p = back(s1)
+            nx = step(s2)
+            if p in segment or nx in segment:
+                break
+            removal = dist[p][s1] + dist[s2][nx] - dist[p][nx]
+            if removal <= 1e-9:
+                continue
+            for end in (s1, s2):
+                for c in neighbors[end]:
+                    if dist[end][c] >= removal:
+                        break
+                    if c in segment or c == p or c == nx:
+                        continue
+                    for d in (tour.next(c), tour.prev(c)):
+                        if d in segment or d == p or d == nx:
+                            continue
+                        delta = or_opt_delta(dist, p, s1, s2, nx, c, d, end)
+                        if delta < -1e-9:
+                            or_opt_move(tour, p, s1, s2, nx, c, d, end)
+                            return delta, (p, s1, s2, nx, c, d)
+    return 0.0, None
+
+
+def improve_three_opt(tour, dist, neighbors, t1):
+    # segment exchange without reversal: t1 [t2..t3] [t4..t5] t6 -> t1 [t4..t5] [t2..t3] t6
+    for succ in (True, False):
+        step = tour.next if succ else tour.prev
+        back = tour.prev if succ else tour.next
+        t2 = step(t1)
+        removed = dist[t1][t2]
+        for t4 in neighbors[t1]:
+            g1 = removed - dist[t1][t4]
+            if g1 <= 0:
+                break
+            t3 = back(t4)
+            if t4 == t2 or t3 == t1:
+                continue
+            # t4 must come after t2 in this orientation
+            if succ and not tour.between(t2, t4, t1) or not succ and not tour.between(t1, t4, t2):
+                continue
+            g1 += dist[t3][t4]
+            for t5 in neighbors[t2]:
+                g2 = g1 - dist[t5][t2]
+                if g2 <= 0:
+                    break
+                t6 = step(t5)
+                if t5 in (t1, t3) or t6 == t2:
+                    continue
+                if succ and not tour.between(t4, t5, t1) or not succ and not tour.between(t1, t5, t4):
+                    continue
+                delta = dist[t3][t6] - dist[t5][t6] - g2
+                if delta < -1e-9:
+                    if succ:
+                        tour.two_opt_move(t1, t2, t5, t6)
+                        tour.two_opt_move(t1, t5, t4, t3)
+                        tour.two_opt_move(t5, t3, t2, t6)
+                    else:
+                        tour.two_opt_move(t2, t1, t6, t5)
+                        tour.two_opt_move(t5, t1, t3, t4)
+                        tour.two_opt_move(t6, t2, t3, t5)
+                    return delta, (t1, t2, t3, t4, t5, t6)
+    return 0.0, None
+
+
+def descend(tour, dist, neighbors, cities, or_opt=True, three_opt=False):
+    # Improves `tour` in place until no move out of any city helps; `dist` and
+    # `neighbors` as nested lists, `cities` the ones to start looking from.
+    # Returns the number of cities examined.
+    # don't-look bits, kept as a queue of the cities whose bit is off
+    queue = deque(cities)
+    queued = [False] * len(dist)
+    for city in queue:
+        queued[city] = True
+    examined = 0
+    while queue:
+        city = queue.popleft()
+        queued[city] = False
+        examined += 1
+        delta, touched = improve_two_opt(tour, dist, neighbors, city)
+        if touched is None and or_opt:
+            delta, touched = improve_or_opt(tour, dist, neighbors, city)
+        if touched is None and three_opt:
+            delta, touched = improve_three_opt(tour, dist, neighbors, city)
+        if touched is not None:
+            for endpoint in touched:
+                if not queued[endpoint]:
+                    queued[endpoint] = True
+                    queue.append(endpoint)
+    return examined
+
+
+def local_search(dist_matrix, route, neighbors=None, or_opt=True, three_opt=False, two_level=None, stats=None):
+    dist = dist_matrix.tolist()
+    if neighbors is None:
+        neighbors = matrix_neighbors(dist_matrix)
+    neighbors = neighbors.tolist()
+    n = len(route)
+    if n < 4:
+        # every tour of three cities or fewer has the same length
+        if stats is not None:
+            stats['evaluations'] = 0
+            stats['unit'] = 'cities'
+        return tour_length(dist_matrix, route), list(route)
+    tour = make_tour(route, two_level)
+    examined = descend(tour, dist, neighbors, route, or_opt, three_opt)
+
+    if stats is not None:
+        stats['evaluations'] = examined
+        stats['unit'] = 'cities'
+    route = tour.to_list()
+    return tour_length(dist_matrix, route), route
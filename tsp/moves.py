@@ -0,0 +1,51 @@
+# Cost changes of the moves the solvers try, computed from the handful of edges
+# each move touches. `dist` is indexed as dist[a][b], so both the NumPy matrix
+# and its `.tolist()` rows work; the nested lists are noticeably faster for the
+# scalar lookups done here. Nothing is modified by the deltas: a swap is applied
+# to a route with apply_swap, 2-opt and Or-opt moves to the tour objects of
+# tsp.tour (two_opt_move, and or_opt_move in tsp.local_search). The tour deltas
+# take the cities at the ends of the edges involved rather than positions, so
+# they hold for either tour representation and for either orientation.
+
+
+def swap_delta(dist, route, i, j):
+    if i == j:
+        return 0.0
+    if i > j:
+        i, j = j, i
+    n = len(route)
+    a = route[i]
+    b = route[j]
+    prev_a = route[i - 1]
+    next_b = route[(j + 1) % n]
+    if j - i == 1:
+        return dist[prev_a][b] + dist[a][next_b] - dist[prev_a][a] - dist[b][next_b]
+    next_a = route[i + 1]
+    prev_b = route[j - 1]
+    if i == 0 and j == n - 1:
+        return dist[b][next_a] + dist[prev_b][a] - dist[a][next_a] - dist[prev_b][b]
+    return (dist[prev_a][b] + dist[b][next_a] + dist[prev_b][a] + dist[a][next_b]
+            - dist[prev_a][a] - dist[a][next_a] - dist[prev_b][b] - dist[b][next_b])
+
+
+def apply_swap(route, i, j, position=None):
+    a = route[i]
+    b = route[j]
+    route[i] = b
+    route[j] = a
+    if position is not None:
+        position[a] = j
+        position[b] = i
+
+
+def two_opt_delta(dist, a, b, c, d):
+    # replace the tour edges a-b and c-d by a-c and b-d, as tour.two_opt_move(a, b, c, d)
+    return dist[a][c] + dist[b][d] - dist[a][b] - dist[c][d]
+
+
+def or_opt_delta(dist, p, s1, s2, nx, c, d, first):
+    # move the path s1..s2 (entered from p, left to nx) between the adjacent
+    # cities c and d, with `first` (s1 or s2) next to c, as or_opt_move does
+    last = s2 if first == s1 else s1
+    return (dist[p][nx] + dist[c][first] + dist[last][d]
+            - dist[p][s1] - dist[s2][nx] - dist[c][d])
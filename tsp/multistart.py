@@ -0,0 +1,75 @@
+import random
+import statistics
+import time
+
+import numpy as np
+
+from tsp.workers import spawn_context
+
+
+def seed_rngs(seed):
+    random.seed(seed)
+    np.random.seed(seed)
+
+
+_worker_job = None
+
+
+def _init_worker(solver, args, kwargs):
+    global _worker_job
+    _worker_job = (solver, args, kwargs)
+
+
+def _run(task):
+    run, seed = task
+    solver, args, kwargs = _worker_job
+    seed_rngs(seed)
+    start = time.perf_counter()
+    distance, route = solver(*args, **kwargs)
+    return {'run': run, 'seed': seed, 'distance': distance, 'route': route, 'time': time.perf_counter() - start}
+
+
+def iter_multi_start(solver, runs, *args, processes=None, seed=None, target=None, **kwargs):
+    # yields one result per run in completion order; stopping early (or reaching
+    # `target`) terminates the pool, cancelling the runs still in flight
+    seeds = random.Random(seed)
+    tasks = [(run, seeds.getrandbits(32)) for run in range(runs)]
+    with spawn_context().Pool(processes, initializer=_init_worker, initargs=(solver, args, kwargs)) as pool:
+        for result in pool.imap_unordered(_run, tasks):
+            yield result
+            if target is not None and result['distance'] <= target:
+                break
+
+
+def multi_start(solver, runs, *args, processes=None, seed=None, target=None, callback=None, **kwargs):
+    start = time.perf_counter()
+    results = []
+    best = None
+    for result in iter_multi_start(solver, runs, *args, processes=processes, seed=seed, target=target, **kwargs):
+        results.append(result)
+        if best is None or result['distance'] < best['distance']:
+            best = result
+        if callback is not None:
+            callback(result, best)
+
+    distances = [result['distance'] for result in results]
+    return {
+        'runs': [{key: value for key, value in result.items() if key != 'route'} for result in results],
+        'completed': len(results),
+        'cancelled': runs - len(results),
+        'best_distance': best['distance'],
+        'best_route': best['route'],
+        'median_distance': statistics.median(distances),
+        'worst_distance': max(distances),
+        'wall_time': time.perf_counter() - start,
+    }
+
+
+def format_report(report):
+    lines = [f"{'run':>4} {'seed':>10} {'distance':>12} {'time (s)':>9}"]
+    for result in sorted(report['runs'], key=lambda result: result['run']):
+        lines.append(f"{result['run']:>4} {result['seed']:>10} {result['distance']:>12.2f} {result['time']:>9.3f}")
+    lines.append(f"best {report['best_distance']:.2f}, median {report['median_distance']:.2f}, "
+                 f"worst {report['worst_distance']:.2f} over {report['completed']} runs "
+                 f"({report['cancelled']} cancelled) in {report['wall_time']:.2f}s")
+    return '\n'.join(lines)
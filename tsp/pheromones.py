@@ -0,0 +1,123 @@
+import numpy as np
+
+# Pheromone stores for tsp.aco. Both take the same updates: evaporate(rho) on
+# every edge, deposit(routes, amounts) along whole tours, blend(...) to pull
+# single edges towards a value (the Ant Colony System updates) and reset(value)
+# to start over. set_bounds(low, high) keeps every trail within [low, high] from
+# then on, for the MAX-MIN Ant System.
+#
+# SparsePheromones keeps pheromone on the candidate edges only, for colonies on
+# instances where an n x n matrix does not fit. trail[i, s] belongs to the edge
+# from i to neighbors[i, s], a CSR layout with exactly k entries per row, so
+# memory is O(n k). Evaporation multiplies one global factor instead of every
+# entry: the stored values are the trails divided by `scale`, and deposits are
+# divided by it on the way in. The stored values are folded back into the
+# trails before the factor can underflow. Bounds are applied when a trail is
+# read or deposited on, so evaporation stays O(1). Edges outside the candidate
+# lists carry no trail; a colony only takes them when every candidate is
+# visited, and then they all compete on the heuristic alone.
+
+
+def tour_edges(routes):
+    # every edge of a population of routes in both directions, as (sources, targets)
+    routes = np.asarray(routes)
+    following = np.roll(routes, -1, axis=1)
+    return np.concatenate((routes.ravel(), following.ravel())), np.concatenate((following.ravel(), routes.ravel()))
+
+
+class DensePheromones:
+    def __init__(self, n, initial=1.0):
+        self.matrix = np.full((n, n), float(initial))
+        self.bounds = None
+
+    def set_bounds(self, low, high):
+        self.bounds = (low, high)
+        np.clip(self.matrix, low, high, out=self.matrix)
+
+    def evaporate(self, rho):
+        self.matrix *= 1.0 - rho
+        if self.bounds is not None:
+            np.maximum(self.matrix, self.bounds[0], out=self.matrix)
+
+    def deposit(self, routes, amounts):
+        # amounts[a] on every edge of routes[a], in both directions
+        routes = np.asarray(routes)
+        following = np.roll(routes, -1, axis=1)
+        deposits = np.broadcast_to(np.asarray(amounts, dtype=np.float64)[:, None], routes.shape)
+        np.add.at(self.matrix, (routes, following), deposits)
+        np.add.at(self.matrix, (following, routes), deposits)
+        if self.bounds is not None:
+            np.minimum(self.matrix, self.bounds[1], out=self.matrix)
+
+    def blend(self, sources, targets, weight, value):
+        # trail = (1 - weight) trail + weight value on every edge sources[e] - targets[e]
+        for a, b in ((sources, targets), (targets, sources)):
+            self.matrix[a, b] = (1.0 - weight) * self.matrix[a, b] + weight * value
+
+    def reset(self, value):
+        self.matrix.fill(value)
+
+    def summary(self):
+        return {'min': self.matrix.min().item(), 'mean': self.matrix.mean().item(), 'max': self.matrix.max().item()}
+
+
+class SparsePheromones:
+    def __init__(self, neighbors, initial=1.0):
+        self.neighbors = np.asarray(neighbors, dtype=np.intp)
+        self.values = np.full(self.neighbors.shape, float(initial))
+        self.scale = 1.0
+        self.bounds = None
+
+    def set_bounds(self, low, high):
+        self.bounds = (low, high)
+
+    def evaporate(self, rho):
+        self.scale *= 1.0 - rho
+        if self.scale < 1e-100:
+            self.values *= self.scale
+            self.scale = 1.0
+
+    def bounded(self, trails):
+        if self.bounds is not None:
+            np.clip(trails, self.bounds[0], self.bounds[1], out=trails)
+        return trails
+
+    def trails(self, cities):
+        # the trails on the candidate edges out of `cities`, row by row
+        return self.bounded(self.values[cities] * self.scale)
+
+    def slots(self, sources, targets):
+        # where each edge sources[e] -> targets[e] is stored, and whether it is
+        matches = self.neighbors[sources] == targets[:, None]
+        return matches.argmax(axis=1), matches.any(axis=1)
+
+    def deposit(self, routes, amounts):
+        # amounts[a] on every edge of routes[a], in both directions
+        routes = np.asarray(routes)
+        amounts = np.tile(np.repeat(np.asarray(amounts, dtype=np.float64) / self.scale, routes.shape[1]), 2)
+        sources, targets = tour_edges(routes)
+        slots, stored = self.slots(sources, targets)
+        rows, slots, amounts = sources[stored], slots[stored], amounts[stored]
+        if self.bounds is None:
+            np.add.at(self.values, (rows, slots), amounts)
+            return
+        # settle the lower bound before adding, then cap at the upper one
+        self.values[rows, slots] = self.bounded(self.values[rows, slots] * self.scale) / self.scale
+        np.add.at(self.values, (rows, slots), amounts)
+        self.values[rows, slots] = np.minimum(self.values[rows, slots], self.bounds[1] / self.scale)
+
+    def blend(self, sources, targets, weight, value):
+        # trail = (1 - weight) trail + weight value on every candidate edge sources[e] - targets[e]
+        for a, b in ((sources, targets), (targets, sources)):
+            slots, stored = self.slots(a, b)
+            rows, slots = a[stored], slots[stored]
+            trails = self.bounded(self.values[rows, slots] * self.scale)
+            self.values[rows, slots] = ((1.0 - weight) * trails + weight * value) / self.scale
+
+    def reset(self, value):
+        self.values.fill(value)
+        self.scale = 1.0
+
+    def summary(self):
+        trails = self.bounded(self.values * self.scale)
+        return {'min': trails.min().item(), 'mean': trails.mean().item(), 'max': trails.max().item()}
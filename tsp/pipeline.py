@@ -0,0 +1,140 @@
+import queue
+import traceback
+
+from tsp.workers import spawn_context
+
+# Runs a solver in a worker process that streams its progress events (see
+# tsp.progress) to the caller over a queue and takes commands back: pause,
+# resume, stop, and parameter changes for solvers that support them. Commands
+# are picked up whenever the solver reports progress. The last event is
+# {'done': True, 'distance': ..., 'route': ...} once the solver returns, or
+# {'done': True, 'error': ..., 'traceback': ...} if it raised; join() raises a
+# failed solver's error in the caller.
+
+
+def _serve(solver, args, kwargs, events, commands):
+    paused = False
+    stopping = False
+    updates = {}
+
+    def progress(event):
+        nonlocal paused, stopping
+        events.put(event)
+        while True:
+            try:
+                command, value = commands.get(block=paused)
+            except queue.Empty:
+                break
+            if command == 'pause':
+                paused = True
+            elif command == 'resume':
+                paused = False
+            elif command == 'stop':
+                paused = False
+                stopping = True
+            elif command == 'set':
+                updates.update(value)
+        if stopping:
+            return True
+        if updates:
+            changed = dict(updates)
+            updates.clear()
+            return changed
+        return False
+
+    try:
+        distance, route = solver(*args, progress=progress, **kwargs)
+    except Exception as error:
+        events.put({'done': True, 'error': repr(error), 'traceback': traceback.format_exc()})
+    else:
+        events.put({'done': True, 'distance': float(distance), 'route': [int(city) for city in route]})
+
+
+class SolverProcess:
+    def __init__(self, solver, *args, **kwargs):
+        # not a daemon, so solvers that start their own worker pool (the island
+        # model, parallel tempering, decomposition) can run in it; join() and
+        # terminate() make sure it does not outlive the caller
+        context = spawn_context()
+        self.events = context.Queue()
+        self.commands = context.Queue()
+        self.process = context.Process(target=_serve, args=(solver, args, kwargs, self.events, self.commands))
+        self.best = None
+        self.last_event = None
+        self.done = False
+        self.paused = False
+        self.error = None
+
+    def start(self):
+        self.process.start()
+        return self
+
+    def pause(self):
+        self.paused = True
+        self.commands.put(('pause', None))
+
+    def resume(self):
+        self.paused = False
+        self.commands.put(('resume', None))
+
+    def stop(self):
+        self.commands.put(('stop', None))
+
+    def set_parameters(self, **parameters):
+        self.commands.put(('set', parameters))
+
+    def poll(self):
+        # the events that arrived since the last call, without waiting
+        arrived = []
+        while True:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                break
+            self.handle(event)
+            arrived.append(event)
+        return arrived
+
+    def handle(self, event):
+        # keeps `best` as the shortest (distance, route) seen so far
+        if event.get('done'):
+            self.done = True
+            if 'error' in event:
+                self.error = event.get('traceback') or event['error']
+            elif 'route' in event:
+                self.offer(event['distance'], event['route'])
+        else:
+            self.last_event = event
+            if 'route' in event:
+                self.offer(event['best'], event['route'])
+
+    def terminate(self):
+        # kills the worker (and with it any pool it started) if it is still running
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+
+    def offer(self, distance, route):
+        if self.best is None or distance < self.best[0]:
+            self.best = (distance, route)
+
+    def join(self):
+        # stops the solver if it is still running and waits for its final result;
+        # a stopped solver still returns the best tour it had found. Raises
+        # RuntimeError if the solver raised or the worker died.
+        if not self.done:
+            self.stop()
+        while not self.done:
+            try:
+                event = self.events.get(timeout=0.1)
+            except queue.Empty:
+                if not self.process.is_alive():
+                    self.error = f'Solver process exited with code {self.process.exitcode} before finishing'
+                    break
+                continue
+            self.handle(event)
+        self.process.join(timeout=5.0)
+        self.terminate()
+        if self.error is not None:
+            raise RuntimeError(f'Solver failed in its worker process:\n{self.error}')
+        return self.best
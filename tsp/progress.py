@@ -0,0 +1,116 @@
+import json
+import queue
+import threading
+import time
+
+# Solvers report progress by calling progress(event) with a plain dict:
+#   solver, iteration, current, best, acceptance, elapsed
+# plus solver-specific keys such as temperature (SA), pheromone (ACO) or mean
+# (GA), and `route`, the best route, whenever it improved since the previous
+# event and the solver has it at hand. A truthy return value asks the solver to
+# stop early; it then returns the best tour found so far. Returning a dict
+# instead changes parameters mid-run: solvers that support it pick the names
+# they know (e.g. temperature, alpha, tabu_size) out of Progress.updates.
+
+
+class Progress:
+    def __init__(self, solver, callback, every=1):
+        self.solver = solver
+        self.callback = callback
+        self.every = every
+        self.start = time.perf_counter()
+        self.last_iteration = 0
+        self.last_best = float('inf')
+        self.updates = {}
+
+    def due(self, iteration):
+        return iteration % self.every == 0
+
+    def emit(self, iteration, current, best, accepted=None, route=None, **extra):
+        window = iteration - self.last_iteration
+        event = {
+            'solver': self.solver,
+            'iteration': iteration,
+            'current': float(current),
+            'best': float(best),
+            'acceptance': accepted / window if accepted is not None and window > 0 else None,
+            'elapsed': time.perf_counter() - self.start,
+        }
+        event.update(extra)
+        if route is not None and best < self.last_best:
+            event['route'] = [int(city) for city in route]
+        self.last_iteration = iteration
+        self.last_best = min(self.last_best, best)
+        reply = self.callback(event)
+        if isinstance(reply, dict):
+            self.updates.update(reply)
+            return False
+        return bool(reply)
+
+
+def reporter(solver, progress, every=1):
+    return None if progress is None else Progress(solver, progress, every)
+
+
+class JsonLinesSink:
+    # one JSON object per event; routes are left out unless asked for
+    def __init__(self, file, routes=False):
+        self.file = file
+        self.routes = routes
+
+    def __call__(self, event):
+        if not self.routes and 'route' in event:
+            event = {key: value for key, value in event.items() if key != 'route'}
+        self.file.write(json.dumps(event) + '\n')
+        self.file.flush()
+
+
+def fan_out(*sinks):
+    # a callback feeding every sink; any of them can ask for a stop or send updates
+    def callback(event):
+        stop = False
+        updates = {}
+        for sink in sinks:
+            reply = sink(event)
+            if isinstance(reply, dict):
+                updates.update(reply)
+            else:
+                stop = bool(reply) or stop
+        return stop or updates
+    return callback
+
+
+def iter_progress(solver, *args, **kwargs):
+    # Runs solver(*args, progress=..., **kwargs) in a thread and yields its events;
+    # the generator's return value is the solver's (distance, route). Closing the
+    # generator early stops the solver at its next event.
+    events = queue.Queue()
+    stopped = threading.Event()
+    result = {}
+
+    def callback(event):
+        events.put(event)
+        return stopped.is_set()
+
+    def run():
+        try:
+            result['value'] = solver(*args, progress=callback, **kwargs)
+        except BaseException as error:
+            result['error'] = error
+        finally:
+            events.put(None)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    try:
+        while True:
+            event = events.get()
+            if event is None:
+                break
+            yield event
+    finally:
+        stopped.set()
+        thread.join()
+    if 'error' in result:
+        raise result['error']
+    return result['value']
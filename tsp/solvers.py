@@ -0,0 +1,95 @@
+import os
+
+from tsp.aco import ant_colony_optimization
+from tsp.annealing import adaptive_annealing, simulated_annealing
+from tsp.genetic import genetic_algorithm, island_genetic_algorithm
+from tsp.hill_climbing import hill_climbing
+from tsp.lin_kernighan import lin_kernighan
+from tsp.tempering import parallel_tempering
+from tsp.tabu import tabu_search
+
+# Every solver with the budget its front-end script uses, behind one
+# (dist_matrix, neighbors) -> (distance, route) signature. They are plain
+# module-level functions so they can be sent to worker processes. `checkpoint`
+# is an optional tsp.checkpoint.Checkpoint and `progress` an event callback
+# (see tsp.progress). A `stats` dict receives 'evaluations', the work actually
+# done (a resumed run counts from its checkpoint, a stopped one up to where it
+# stopped), and 'unit', what one evaluation is: a move whose delta was computed
+# ('moves'), a tour built and scored ('tours'), a city popped by local search
+# ('cities') or a Lin-Kernighan kick ('kicks'). Rates are only comparable
+# between solvers with the same unit.
+#
+# The solvers in CONSTRAINED also take `constraints`, a tsp.constraints.Constraints
+# whose penalties they minimise together with the length; the local searches
+# (hill, lk) optimise length alone.
+
+
+def run_tabu(dist_matrix, neighbors, stats=None, checkpoint=None, progress=None, constraints=None):
+    return tabu_search(dist_matrix, 100000, 20, neighbors=neighbors, constraints=constraints, checkpoint=checkpoint,
+                       progress=progress, stats=stats)
+
+
+def run_genetic(dist_matrix, neighbors, stats=None, checkpoint=None, progress=None, constraints=None):
+    return genetic_algorithm(dist_matrix, 100, 500, constraints=constraints, checkpoint=checkpoint, progress=progress,
+                             stats=stats)
+
+
+def run_islands(dist_matrix, neighbors, stats=None, checkpoint=None, progress=None, constraints=None):
+    return island_genetic_algorithm(dist_matrix, 100, 500, islands=os.cpu_count(), constraints=constraints,
+                                    checkpoint=checkpoint, progress=progress, stats=stats)
+
+
+def run_aco(dist_matrix, neighbors, stats=None, checkpoint=None, progress=None, constraints=None):
+    return ant_colony_optimization(dist_matrix, neighbors=neighbors, constraints=constraints, checkpoint=checkpoint,
+                                   progress=progress, stats=stats)
+
+
+def run_max_min_ants(dist_matrix, neighbors, stats=None, checkpoint=None, progress=None, constraints=None):
+    return ant_colony_optimization(dist_matrix, 25, 100, variant='mmas', two_opt=True, neighbors=neighbors,
+                                   constraints=constraints, checkpoint=checkpoint, progress=progress, stats=stats)
+
+
+def run_ant_colony_system(dist_matrix, neighbors, stats=None, checkpoint=None, progress=None, constraints=None):
+    return ant_colony_optimization(dist_matrix, 10, 100, variant='acs', two_opt=True, neighbors=neighbors,
+                                   constraints=constraints, checkpoint=checkpoint, progress=progress, stats=stats)
+
+
+def run_annealing(dist_matrix, neighbors, stats=None, checkpoint=None, progress=None, constraints=None):
+    return simulated_annealing(dist_matrix, 1000, 0.99, 10000, neighbors=neighbors, constraints=constraints,
+                               checkpoint=checkpoint, progress=progress, stats=stats)
+
+
+def run_adaptive_annealing(dist_matrix, neighbors, stats=None, checkpoint=None, progress=None, constraints=None):
+    return adaptive_annealing(dist_matrix, 10.0, neighbors=neighbors, constraints=constraints, checkpoint=checkpoint,
+                              progress=progress, stats=stats)
+
+
+def run_parallel_tempering(dist_matrix, neighbors, stats=None, checkpoint=None, progress=None, constraints=None):
+    return parallel_tempering(dist_matrix, 10.0, neighbors=neighbors, constraints=constraints, checkpoint=checkpoint,
+                              progress=progress, stats=stats)
+
+
+def run_hill_climbing(dist_matrix, neighbors, stats=None, checkpoint=None, progress=None):
+    # a single descent takes milliseconds; there is nothing worth checkpointing
+    return hill_climbing(dist_matrix, neighbors=neighbors, progress=progress, stats=stats)
+
+
+def run_lin_kernighan(dist_matrix, neighbors, stats=None, checkpoint=None, progress=None):
+    return lin_kernighan(dist_matrix, neighbors, checkpoint=checkpoint, progress=progress, stats=stats)
+
+
+SOLVERS = {
+    'tabu': run_tabu,
+    'ga': run_genetic,
+    'islands': run_islands,
+    'aco': run_aco,
+    'mmas': run_max_min_ants,
+    'acs': run_ant_colony_system,
+    'sa': run_annealing,
+    'asa': run_adaptive_annealing,
+    'pt': run_parallel_tempering,
+    'hill': run_hill_climbing,
+    'lk': run_lin_kernighan,
+}
+
+CONSTRAINED = ('tabu', 'ga', 'islands', 'aco', 'mmas', 'acs', 'sa', 'asa', 'pt')
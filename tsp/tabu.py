@@ -0,0 +1,113 @@
+import random
+
+from tsp.candidates import candidate_two_opt
+from tsp.constraints import two_opt_penalty_delta
+from tsp.distance_matrix import tour_length
+from tsp.moves import two_opt_delta
+from tsp.progress import reporter
+from tsp.tour import make_tour
+
+
+def edge(a, b):
+    return (a, b) if a < b else (b, a)
+
+
+def tabu_search(dist_matrix, max_iterations, tabu_size, candidate_size=50, neighbors=None, two_level=None,
+                constraints=None, checkpoint=None, progress=None, stats=None):
+    # with tsp.constraints.Constraints the search minimises length + penalty on
+    # an ArrayTour, whose array order gives the ranks, and the route returned
+    # starts at the depot
+    dist = dist_matrix.tolist()
+    n = len(dist)
+    if neighbors is not None:
+        neighbors = neighbors.tolist()
+    if constraints is not None:
+        penalty = constraints.penalty_rows()
+        depot = constraints.depot
+        two_level = False
+
+    state = checkpoint.load('tabu') if checkpoint is not None else None
+    if state is None:
+        route = list(range(n))
+        random.shuffle(route)
+        current_distance = tour_length(dist_matrix, route)
+        if constraints is not None:
+            current_distance += constraints.route_penalty(route)
+        tour = make_tour(route, two_level)
+        # the journal holds the moves made since the best tour was seen; rolling it
+        # back at the end restores that tour without copying the route on every improvement
+        tour.journal = []
+        best_distance = current_distance
+        # recently removed edges -> last iteration for which adding them back is tabu
+        tabu = {}
+        first_iteration = 0
+        evaluations = 0
+    else:
+        tour = state['tour']
+        current_distance = state['current_distance']
+        best_distance = state['best_distance']
+        tabu = state['tabu']
+        first_iteration = state['iteration']
+        evaluations = state['evaluations']
+
+    progress = reporter('tabu', progress, every=max(1, max_iterations // 200))
+    accepted = 0
+    for iteration in range(first_iteration, max_iterations):
+        best_move = None
+        best_delta = float('inf')
+
+        for _ in range(candidate_size):
+            move = candidate_two_opt(tour, n, neighbors)
+            if move is None:
+                continue
+            a, b, c, d = move
+            evaluations += 1
+            delta = two_opt_delta(dist, a, b, c, d)
+            if constraints is not None:
+                delta += two_opt_penalty_delta(penalty, tour, depot, b, c)
+            if delta >= best_delta:
+                continue
+            is_tabu = tabu.get(edge(a, c), -1) >= iteration or tabu.get(edge(b, d), -1) >= iteration
+            # aspiration: a tabu move is still allowed if it gives a new best tour
+            if is_tabu and current_distance + delta >= best_distance:
+                continue
+            best_move = (a, b, c, d)
+            best_delta = delta
+
+        if best_move is not None:
+            a, b, c, d = best_move
+            tabu[edge(a, b)] = iteration + tabu_size
+            tabu[edge(c, d)] = iteration + tabu_size
+            tour.two_opt_move(a, b, c, d)
+            current_distance += best_delta
+            accepted += 1
+
+            if current_distance < best_distance:
+                best_distance = current_distance
+                tour.journal.clear()
+
+        if len(tabu) > 4 * tabu_size:
+            tabu = {attribute: tenure for attribute, tenure in tabu.items() if tenure >= iteration}
+
+        if checkpoint is not None and checkpoint.due():
+            checkpoint.save('tabu', {'iteration': iteration + 1, 'tour': tour, 'current_distance': current_distance,
+                                     'best_distance': best_distance, 'tabu': tabu, 'evaluations': evaluations})
+
+        if progress is not None and progress.due(iteration + 1):
+            # the best route is only at hand while no move has been made since it was found
+            route = None if tour.journal else tour.to_list()
+            if progress.emit(iteration + 1, current_distance, best_distance, accepted, route, tabu=len(tabu),
+                             tabu_size=tabu_size):
+                break
+            accepted = 0
+            if progress.updates:
+                tabu_size = int(progress.updates.pop('tabu_size', tabu_size))
+
+    tour.rollback(0)
+    if stats is not None:
+        stats['evaluations'] = evaluations
+        stats['unit'] = 'moves'
+    best_route = tour.to_list()
+    if constraints is not None:
+        best_route = constraints.from_depot(best_route)
+    return tour_length(dist_matrix, best_route), best_route
@@ -0,0 +1,193 @@
+import math
+import random
+import time
+from multiprocessing import cpu_count, shared_memory
+
+import numpy as np
+
+from tsp.annealing import calibrate_temperatures
+from tsp.candidates import candidate_two_opt, matrix_neighbors
+from tsp.constraints import two_opt_penalty_delta
+from tsp.distance_matrix import population_lengths, tour_length
+from tsp.moves import two_opt_delta
+from tsp.progress import reporter
+from tsp.tour import ArrayTour
+from tsp.workers import spawn_context
+
+# Parallel tempering (replica exchange): M chains sample at a fixed ladder of
+# temperatures, spread over worker processes, and after every epoch chains at
+# adjacent temperatures may swap. Each chain's current and best route live in
+# shared memory (rows r and M + r of one array, with their lengths alongside),
+# so a worker reads and writes its chain in place and a swap just exchanges
+# which chain runs at which temperature; no route is ever pickled.
+
+_worker = None
+
+
+def _init_worker(dist_matrix, neighbors, constraints, routes_name, lengths_name, replicas):
+    global _worker
+    routes_memory = shared_memory.SharedMemory(name=routes_name)
+    lengths_memory = shared_memory.SharedMemory(name=lengths_name)
+    n = len(dist_matrix)
+    routes = np.ndarray((2 * replicas, n), dtype=np.int64, buffer=routes_memory.buf)
+    lengths = np.ndarray(2 * replicas, dtype=np.float64, buffer=lengths_memory.buf)
+    penalty = None if constraints is None else (constraints.penalty_rows(), constraints.depot)
+    # the SharedMemory handles are kept so the buffers stay mapped
+    _worker = (dist_matrix.tolist(), neighbors.tolist(), penalty, routes, lengths, routes_memory, lengths_memory)
+
+
+def _sample_replica(replica, temperature, moves, seed, batch_size=1000):
+    # Metropolis sampling of one chain at a fixed temperature; returns the
+    # numbers of accepted and of scored moves
+    random.seed(seed)
+    np.random.seed(seed)
+    dist, neighbors, penalty, routes, lengths, _, _ = _worker
+    replicas = len(lengths) // 2
+    n = len(dist)
+    tour = ArrayTour(routes[replica].tolist())
+    current = lengths[replica].item()
+    best = lengths[replicas + replica].item()
+    best_route = None
+    at_best = False
+    accepted = 0
+    scored = 0
+    for _ in range(0, moves, batch_size):
+        for threshold in (-temperature * np.log(1.0 - np.random.random(batch_size))).tolist():
+            move = candidate_two_opt(tour, n, neighbors)
+            if move is None:
+                continue
+            scored += 1
+            a, b, c, d = move
+            delta = two_opt_delta(dist, a, b, c, d)
+            if penalty is not None:
+                delta += two_opt_penalty_delta(penalty[0], tour, penalty[1], b, c)
+            if delta < threshold:
+                if at_best and delta > 0:
+                    best_route = tour.to_list()
+                    at_best = False
+                tour.two_opt_move(a, b, c, d)
+                current += delta
+                accepted += 1
+                if current < best - 1e-9:
+                    best = current
+                    at_best = True
+    if at_best:
+        best_route = tour.order
+    routes[replica] = tour.order
+    lengths[replica] = current
+    if best_route is not None:
+        routes[replicas + replica] = best_route
+        lengths[replicas + replica] = best
+    return accepted, scored
+
+
+def temperature_ladder(low, high, replicas):
+    # geometric spacing keeps the swap acceptance roughly even along the ladder
+    if replicas == 1:
+        return [low]
+    return [low * (high / low) ** (k / (replicas - 1)) for k in range(replicas)]
+
+
+def parallel_tempering(dist_matrix, time_limit=10.0, replicas=None, moves_per_exchange=5000, min_temperature=None,
+                       max_temperature=None, processes=None, neighbors=None, constraints=None, checkpoint=None,
+                       progress=None, stats=None):
+    # The ladder runs from min_temperature (the coldest chain, which does the
+    # final descent) to max_temperature (the hottest, which keeps exploring);
+    # both default to the temperatures calibrate_temperatures picks for simulated
+    # annealing. Even and odd neighbouring pairs are offered a swap on alternate
+    # epochs and accepted with probability min(1, exp((1/T_k - 1/T_k+1)(E_k - E_k+1))).
+    # With constraints, E is length + penalty.
+    n = len(dist_matrix)
+    if neighbors is None:
+        neighbors = matrix_neighbors(dist_matrix)
+    replicas = replicas or max(8, cpu_count())
+
+    state = checkpoint.load('pt') if checkpoint is not None else None
+    if state is None:
+        routes = np.random.random((replicas, n)).argsort(axis=1)
+        lengths = population_lengths(dist_matrix, routes)
+        if constraints is not None:
+            lengths += constraints.population_penalties(routes)
+        # the starting tours are also the best ones seen so far
+        routes = np.vstack((routes, routes))
+        lengths = np.concatenate((lengths, lengths))
+        calibrated = calibrate_temperatures(dist_matrix.tolist(), ArrayTour(routes[0].tolist()), neighbors.tolist())
+        temperatures = temperature_ladder(min_temperature or calibrated[1], max_temperature or calibrated[0] / 10,
+                                          replicas)
+        # replica_at[k] is the chain currently sampled at temperatures[k]
+        replica_at = list(range(replicas))
+        elapsed = 0.0
+        epoch = 0
+        evaluations = 0
+        swaps = [0] * (replicas - 1)
+    else:
+        routes, lengths = state['routes'], state['lengths']
+        temperatures, replica_at = state['temperatures'], state['replica_at']
+        elapsed, epoch, swaps = state['elapsed'], state['epoch'], state['swaps']
+        evaluations = state['evaluations']
+        replicas = len(temperatures)
+    progress = reporter('pt', progress)
+
+    routes_memory = shared_memory.SharedMemory(create=True, size=routes.size * 8)
+    lengths_memory = shared_memory.SharedMemory(create=True, size=lengths.size * 8)
+    try:
+        shared_routes = np.ndarray(routes.shape, dtype=np.int64, buffer=routes_memory.buf)
+        shared_lengths = np.ndarray(lengths.shape, dtype=np.float64, buffer=lengths_memory.buf)
+        shared_routes[:] = routes
+        shared_lengths[:] = lengths
+
+        context = spawn_context()
+        clock = time.perf_counter() - elapsed
+        with context.Pool(processes or min(replicas, cpu_count()), initializer=_init_worker,
+                          initargs=(dist_matrix, neighbors, constraints, routes_memory.name, lengths_memory.name,
+                                    replicas)) as pool:
+            while elapsed < time_limit:
+                tasks = [(replica_at[k], temperatures[k], moves_per_exchange, random.getrandbits(32))
+                         for k in range(replicas)]
+                counts = pool.starmap(_sample_replica, tasks)
+                accepted = sum(count[0] for count in counts)
+                scored = sum(count[1] for count in counts)
+                evaluations += scored
+                epoch += 1
+
+                for k in range(epoch % 2, replicas - 1, 2):
+                    i, j = replica_at[k], replica_at[k + 1]
+                    exponent = (1.0 / temperatures[k] - 1.0 / temperatures[k + 1]) * (shared_lengths[i] -
+                                                                                       shared_lengths[j])
+                    if exponent >= 0 or random.random() < math.exp(exponent):
+                        replica_at[k], replica_at[k + 1] = j, i
+                        swaps[k] += 1
+                elapsed = time.perf_counter() - clock
+
+                if checkpoint is not None and checkpoint.due():
+                    checkpoint.save('pt', {'routes': shared_routes.copy(), 'lengths': shared_lengths.copy(),
+                                           'temperatures': temperatures, 'replica_at': replica_at,
+                                           'elapsed': elapsed, 'epoch': epoch, 'evaluations': evaluations,
+                                           'swaps': swaps})
+                if progress is not None:
+                    best = replicas + int(shared_lengths[replicas:].argmin())
+                    # each pair is offered a swap every other epoch
+                    swap_rates = [count / max(1, (epoch + k % 2) // 2) for k, count in enumerate(swaps)]
+                    # one event per epoch, so the acceptance is the share of this epoch's moves
+                    if progress.emit(epoch, shared_lengths[replica_at[0]], shared_lengths[best],
+                                     accepted / max(1, scored), shared_routes[best],
+                                     swap_rates=swap_rates,
+                                     temperatures=temperatures):
+                        break
+                    time_limit = progress.updates.pop('time_limit', time_limit)
+
+        best = replicas + int(shared_lengths[replicas:].argmin())
+        route = shared_routes[best].tolist()
+        if constraints is not None:
+            route = constraints.from_depot(route)
+    finally:
+        routes_memory.close()
+        routes_memory.unlink()
+        lengths_memory.close()
+        lengths_memory.unlink()
+
+    if stats is not None:
+        stats['evaluations'] = evaluations
+        stats['unit'] = 'moves'
+        stats['swaps'] = sum(swaps)
+    return tour_length(dist_matrix, route), route
@@ -0,0 +1,241 @@
+import math
+
+# Tour representations with O(1) next/prev/between queries. A reversal may
+# flip whichever side of the tour is cheaper, which can mirror the orientation,
+# so callers express moves through the edges they remove and add
+# (two_opt_move), never through "forward". While `journal` is a list every
+# 2-opt move is recorded in it so a caller can roll the tour back.
+#
+# ArrayTour reverses in O(n) element swaps; TwoLevelTour keeps the tour as
+# ~sqrt(n) segments with a reversed bit each, so a reversal splits at most two
+# segments and flips the ones in between in O(sqrt n).
+
+
+class Tour:
+    journal = None
+
+    def two_opt_move(self, a, b, c, d):
+        # remove (a, b) and (c, d), add (a, c) and (b, d); b follows a and d follows c
+        # in the same orientation
+        if self.next(a) == b:
+            self.reverse(b, c)
+        else:
+            self.reverse(c, b)
+        if self.journal is not None:
+            self.journal.append((a, b, c, d))
+
+    def rollback(self, mark):
+        # undo the journaled moves past `mark`, newest first
+        journal = self.journal
+        self.journal = None
+        while len(journal) > mark:
+            a, b, c, d = journal.pop()
+            self.two_opt_move(a, c, b, d)
+        self.journal = journal
+
+
+class ArrayTour(Tour):
+    def __init__(self, route):
+        self.order = list(route)
+        self.position = [0] * len(self.order)
+        for index, city in enumerate(self.order):
+            self.position[city] = index
+
+    def __len__(self):
+        return len(self.order)
+
+    def next(self, city):
+        index = self.position[city] + 1
+        return self.order[index if index < len(self.order) else 0]
+
+    def prev(self, city):
+        return self.order[self.position[city] - 1]
+
+    def between(self, a, b, c):
+        # is b on the forward path from a to c?
+        i, j, k = self.position[a], self.position[b], self.position[c]
+        if i <= k:
+            return i <= j <= k
+        return j >= i or j <= k
+
+    def reverse(self, first, last):
+        # reverse the forward path first..last
+        order = self.order
+        position = self.position
+        n = len(order)
+        i = position[first]
+        j = position[last]
+        length = (j - i) % n + 1
+        if 2 * length > n:
+            i, j = (j + 1) % n, (i - 1) % n
+            length = n - length
+        for _ in range(length // 2):
+            a = order[i]
+            b = order[j]
+            order[i] = b
+            position[b] = i
+            order[j] = a
+            position[a] = j
+            i = i + 1 if i + 1 < n else 0
+            j = j - 1 if j else n - 1
+
+    def to_list(self):
+        return self.order[:]
+
+
+class Segment:
+    __slots__ = ('cities', 'reversed', 'rank')
+
+    def __init__(self, cities, reversed, rank):
+        self.cities = cities
+        self.reversed = reversed
+        self.rank = rank
+
+
+class TwoLevelTour(Tour):
+    def __init__(self, route, segment_size=None):
+        self.size = len(route)
+        self.segment_size = segment_size or max(8, math.isqrt(self.size))
+        self.segment = [None] * self.size
+        self.index = [0] * self.size
+        self.build(route)
+
+    def build(self, route):
+        size = self.segment_size
+        self.segments = []
+        for start in range(0, len(route), size):
+            self.segments.append(Segment(list(route[start:start + size]), False, len(self.segments)))
+        for segment in self.segments:
+            self.reindex(segment, 0, len(segment.cities))
+
+    def reindex(self, segment, start, stop):
+        cities = segment.cities
+        for i in range(start, stop):
+            city = cities[i]
+            self.segment[city] = segment
+            self.index[city] = i
+
+    def __len__(self):
+        return self.size
+
+    def next(self, city):
+        segment = self.segment[city]
+        i = self.index[city]
+        cities = segment.cities
+        if segment.reversed:
+            if i:
+                return cities[i - 1]
+        elif i + 1 < len(cities):
+            return cities[i + 1]
+        rank = segment.rank + 1
+        following = self.segments[rank if rank < len(self.segments) else 0]
+        return following.cities[-1] if following.reversed else following.cities[0]
+
+    def prev(self, city):
+        segment = self.segment[city]
+        i = self.index[city]
+        cities = segment.cities
+        if segment.reversed:
+            if i + 1 < len(cities):
+                return cities[i + 1]
+        elif i:
+            return cities[i - 1]
+        preceding = self.segments[segment.rank - 1]
+        return preceding.cities[0] if preceding.reversed else preceding.cities[-1]
+
+    def sequence(self, city):
+        # position along the tour, comparable between cities
+        segment = self.segment[city]
+        i = self.index[city]
+        if segment.reversed:
+            i = len(segment.cities) - 1 - i
+        return segment.rank * self.size + i
+
+    def between(self, a, b, c):
+        i, j, k = self.sequence(a), self.sequence(b), self.sequence(c)
+        if i <= k:
+            return i <= j <= k
+        return j >= i or j <= k
+
+    def split_before(self, city):
+        # make `city` the first city of its segment, in tour order
+        segment = self.segment[city]
+        cities = segment.cities
+        i = self.index[city]
+        if segment.reversed:
+            if i == len(cities) - 1:
+                return
+            head, tail = cities[i + 1:], cities[:i + 1]
+        else:
+            if i == 0:
+                return
+            head, tail = cities[:i], cities[i:]
+        segment.cities = tail
+        self.reindex(segment, 0, len(tail))
+        created = Segment(head, segment.reversed, segment.rank)
+        self.reindex(created, 0, len(head))
+        self.segments.insert(segment.rank, created)
+        for rank in range(segment.rank, len(self.segments)):
+            self.segments[rank].rank = rank
+
+    def reverse(self, first, last):
+        # reverse the forward path first..last
+        if first == last:
+            return
+        segment = self.segment[first]
+        if segment is self.segment[last]:
+            i = self.index[first]
+            j = self.index[last]
+            if (i <= j) != segment.reversed:
+                # the path lies inside one segment: reverse it in place
+                if i > j:
+                    i, j = j, i
+                segment.cities[i:j + 1] = segment.cities[j:i - 1 if i else None:-1]
+                self.reindex(segment, i, j + 1)
+                return
+
+        self.split_before(first)
+        after = self.next(last)
+        if after == first:
+            # the path is the whole tour; as a cycle it is unchanged
+            return
+        self.split_before(after)
+        segments = self.segments
+        m = len(segments)
+        i = self.segment[first].rank
+        j = self.segment[last].rank
+        length = (j - i) % m + 1
+        if 2 * length > m:
+            i, j = (j + 1) % m, (i - 1) % m
+            length = m - length
+        k = i
+        for _ in range(length):
+            segments[k].reversed = not segments[k].reversed
+            k = k + 1 if k + 1 < m else 0
+        for _ in range(length // 2):
+            a = segments[i]
+            b = segments[j]
+            segments[i] = b
+            b.rank = i
+            segments[j] = a
+            a.rank = j
+            i = i + 1 if i + 1 < m else 0
+            j = j - 1 if j else m - 1
+
+        # every reversal adds at most two segments; rebuild once they are twice
+        # as many as needed, which keeps the amortised cost at O(sqrt n)
+        if m > 2 * (self.size // self.segment_size + 1):
+            self.build(self.to_list())
+
+    def to_list(self):
+        route = []
+        for segment in self.segments:
+            route.extend(reversed(segment.cities) if segment.reversed else segment.cities)
+        return route
+
+
+def make_tour(route, two_level=None):
+    # the two-level list only pays off once reversals on a flat array get long
+    if two_level is None:
+        two_level = len(route) >= 1000
+    return TwoLevelTour(route) if two_level else ArrayTour(route)
@@ -0,0 +1,11 @@
+from multiprocessing import get_context
+
+# Every worker process the library starts comes from this context. Spawned
+# workers begin in a fresh interpreter instead of a fork of the caller, so they
+# inherit none of its threads or the locks those threads held: forking a front
+# end that has started a display or audio thread (pygame does) can deadlock the
+# child. It also behaves the same on every platform.
+
+
+def spawn_context():
+    return get_context('spawn')